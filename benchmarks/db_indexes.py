@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+# Hot-query latency before and after the index migration.
+# Usage: python -m benchmarks.db_indexes [--rows 1000000] [--db /tmp/bench.db]
+
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import measure, print_table  # noqa: E402
+from utils.db import SCHEMA_VERSION, Database  # noqa: E402
+
+GUILDS = 100
+NOW = "2024-01-01T00:00:00+00:00"
+
+QUERIES = {
+    "infraction history": ("SELECT id, reason, created_at FROM infractions WHERE guild_id=? AND user_id=? ORDER BY id DESC LIMIT 10", 2),
+    "staff history": ("SELECT event_type, created_at FROM staff_events WHERE guild_id=? AND user_id=? ORDER BY id DESC LIMIT 10", 2),
+    "session end lookup": ("SELECT id FROM sessions WHERE guild_id=? AND user_id=? AND ended_at IS NULL ORDER BY id DESC LIMIT 1", 2),
+    "top_balances": ("SELECT user_id, balance FROM economy_users WHERE guild_id=? ORDER BY balance DESC LIMIT 10", 1),
+    "appeal list": ("SELECT id, user_id, status FROM appeals WHERE guild_id=? ORDER BY id DESC LIMIT 20", 1),
+}
+
+
+def populate(db: Database, rows: int) -> None:
+    rng = random.Random(7)
+    users = max(1, rows // GUILDS // 10)
+
+    def key():
+        return rng.randrange(GUILDS), rng.randrange(users)
+
+    with db.transaction():
+        db._exec_many(
+            "INSERT INTO infractions (guild_id, user_id, actor_id, reason, created_at) VALUES (?, ?, 1, 'bench', ?)",
+            ((*key(), NOW) for _ in range(rows)),
+        )
+        db._exec_many(
+            "INSERT INTO staff_events (guild_id, user_id, actor_id, event_type, details_json, created_at) VALUES (?, ?, 1, 'promote', '{}', ?)",
+            ((*key(), NOW) for _ in range(rows)),
+        )
+        db._exec_many(
+            "INSERT INTO sessions (guild_id, user_id, started_at, ended_at) VALUES (?, ?, ?, ?)",
+            ((*key(), NOW, NOW if rng.random() < 0.99 else None) for _ in range(rows)),
+        )
+        db._exec_many(
+            "INSERT OR IGNORE INTO economy_users (guild_id, user_id, balance) VALUES (?, ?, ?)",
+            ((*key(), rng.randrange(1_000_000)) for _ in range(rows)),
+        )
+        db._exec_many(
+            "INSERT INTO appeals (guild_id, user_id, status, reason, evidence, created_at) VALUES (?, ?, 'pending', '', '', ?)",
+            ((*key(), NOW) for _ in range(rows // 10)),
+        )
+    db._exec("ANALYZE")
+
+
+def run_queries(db: Database, repeat: int) -> list[tuple[str, dict[str, float]]]:
+    rng = random.Random(11)
+    results = []
+    for name, (sql, arity) in QUERIES.items():
+        def call():
+            args = (rng.randrange(GUILDS), rng.randrange(1000))[:arity]
+            db._exec(sql, args).fetchall()
+
+        results.append((name, measure(call, repeat=repeat, warmup=2)))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hot SQLite queries with and without the index migration.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+
+    path = Path(args.db or Path(tempfile.mkdtemp()) / "bench.db")
+    path.unlink(missing_ok=True)
+    print(f"Populating {path} with {args.rows:,} rows per table...")
+    db = Database(str(path), schema_version=1)
+    populate(db, args.rows)
+    before = run_queries(db, args.repeat)
+    db.conn.close()
+
+    db = Database(str(path))
+    db._exec("ANALYZE")
+    after = run_queries(db, args.repeat)
+    print_table("Before (schema v1, no secondary indexes)", before)
+    print_table(f"After (schema v{SCHEMA_VERSION})", after)
+    print("\nPlans:")
+    for name, (sql, arity) in QUERIES.items():
+        plan = db._exec(f"EXPLAIN QUERY PLAN {sql}", (1, 1)[:arity]).fetchall()
+        print(f"  {name}: {' / '.join(r[3] for r in plan)}")
+    db.conn.close()
+
+
+if __name__ == "__main__":
+    main()
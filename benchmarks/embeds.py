@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+# Embed construction cost per call, without a Discord connection.
+# Usage: python -m benchmarks.embeds [--save] [--repeat 5000]
+#   --save writes benchmarks/baselines/embeds.json; later runs print the change against it.
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import change, load_baseline, measure, measure_allocations, save_baseline  # noqa: E402
+from core.config import DEFAULT_CONFIG  # noqa: E402
+from core.embeds import BrandingCache, apply_variables, build_embed  # noqa: E402
+from core.storage import ShardedJsonStore  # noqa: E402
+from utils.embed_templates import build_from_template, parse_template, render_template  # noqa: E402
+from utils.ui_embeds import themed_embed  # noqa: E402
+
+GUILD_ID = 123456789012345678
+DASHBOARD = "Server: {guild_name}\nMembers: {member_count}\nSession: {session_status}\nPremium: {premium_status}\nUpdated: {timestamp}"
+GUILD_CONFIG = {
+    "embed_branding": {"author": "Blox Roleplay", "footer": "Blox Roleplay | Staff Team", "thumbnail_url": "https://cdn.example.com/logo.png", "banner_url": "https://cdn.example.com/banner.png"},
+    "embed_style": {"color": 0x1ABC9C, "footer": "", "author": ""},
+    "embed_templates": {"title_prefix": "» ", "description_suffix": "\n\n*Blox Roleplay*"},
+    "dashboard_template": DASHBOARD,
+}
+
+
+def discohook(embeds: int, paragraphs: int) -> str:
+    body = " ".join(["{user} joined {guild_name} at {timestamp}; {server_name} welcomes you."] * paragraphs)
+    return json.dumps({
+        "content": "{user} started a session",
+        "embeds": [
+            {
+                "title": "Session {session_id} started",
+                "description": body,
+                "color": 0x5865F2,
+                "footer": {"text": "{server_name} | {timestamp}"},
+                "author": {"name": "{user_name}"},
+                "thumbnail": {"url": "https://cdn.example.com/t.png"},
+            }
+            for _ in range(embeds)
+        ],
+    })
+
+
+TEMPLATE_SMALL = discohook(1, 1)
+TEMPLATE_LARGE = discohook(5, 20)
+VARIABLES = {
+    "user": "<@1234567890>",
+    "user_name": "Tyler",
+    "guild_name": "Blox Roleplay",
+    "server_name": "Blox RP",
+    "session_id": "42",
+    "timestamp": "2024-05-01 12:00 UTC",
+}
+
+
+class Guild:
+    id = GUILD_ID
+    name = "Blox Roleplay"
+    member_count = 2500
+
+
+class User:
+    mention = "<@1234567890>"
+
+
+class Bot:
+    def __init__(self, directory: Path):
+        self.config = DEFAULT_CONFIG
+        self.guild_store = ShardedJsonStore(directory, write_behind=True)
+        self.guild_store.write(GUILD_ID, GUILD_CONFIG)
+        self.branding_cache = BrandingCache(self)
+
+
+def cases(bot: Bot) -> dict:
+    guild, user = Guild(), User()
+    parsed_small, parsed_large = parse_template(TEMPLATE_SMALL), parse_template(TEMPLATE_LARGE)
+    extra = {"session_status": "Online", "premium_status": "Premium"}
+
+    def build_uncached():
+        bot.branding_cache.invalidate(GUILD_ID)
+        return build_embed(bot, guild, "Session Started", "Your session is now active.")
+
+    return {
+        "build_embed (no guild)": lambda: build_embed(bot, None, "Session Started", "Your session is now active."),
+        "build_embed (branded, cached)": lambda: build_embed(bot, guild, "Session Started", "Your session is now active."),
+        "build_embed (branded, cold)": build_uncached,
+        "themed_embed": lambda: themed_embed("Session Started", "Your session is now active."),
+        "apply_variables (dashboard)": lambda: apply_variables(DASHBOARD, guild, user, extra),
+        "build_from_template (1 embed)": lambda: build_from_template(TEMPLATE_SMALL, VARIABLES),
+        "build_from_template (5 embeds)": lambda: build_from_template(TEMPLATE_LARGE, VARIABLES),
+        "render parsed (1 embed)": lambda: render_template(parsed_small, VARIABLES),
+        "render parsed (5 embeds)": lambda: render_template(parsed_large, VARIABLES),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark embed construction paths.")
+    parser.add_argument("--repeat", type=int, default=5000)
+    parser.add_argument("--save", action="store_true", help="store results as the new baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(Bot(Path(tmp) / "guilds"), args.repeat)
+    if args.save:
+        print(f"\nBaseline saved to {save_baseline('embeds', results)}")
+
+
+def run(bot: Bot, repeat: int) -> dict[str, dict[str, float]]:
+    baseline = load_baseline("embeds") or {}
+    results: dict[str, dict[str, float]] = {}
+    print(f"{'case':<34} {'ops/sec':>10} {'vs base':>9} {'p99 us':>8} {'KiB/call':>9} {'blocks':>7}")
+    for name, fn in cases(bot).items():
+        timing = measure(fn, repeat=repeat, warmup=50)
+        allocs = measure_allocations(fn)
+        results[name] = {"ops_per_sec": timing["ops_per_sec"], "p99_ms": timing["p99_ms"], **allocs}
+        base = baseline.get(name, {}).get("ops_per_sec")
+        print(
+            f"{name:<34} {timing['ops_per_sec']:>10.0f} {change(timing['ops_per_sec'], base):>9} "
+            f"{timing['p99_ms'] * 1000:>8.1f} {allocs['bytes_per_call'] / 1024:>9.2f} {allocs['blocks_per_call']:>7.1f}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def measure(fn: Callable[[], Any], repeat: int = 200, warmup: int = 5) -> dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "mean_ms": statistics.fmean(samples),
+        "ops_per_sec": 1000 / statistics.fmean(samples) if any(samples) else float("inf"),
+    }
+
+
+def measure_allocations(fn: Callable[[], Any], calls: int = 200) -> dict[str, float]:
+    # Peak traced memory per call, plus blocks still held by the results
+    # (kept alive on purpose so they show up in the snapshot diff).
+    fn()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        kept = [fn() for _ in range(calls)]
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return {"bytes_per_call": (peak - base) / calls, "blocks_per_call": blocks / calls}
+
+
+def print_table(title: str, rows: list[tuple[str, dict[str, float]]]) -> None:
+    print(f"\n{title}")
+    print(f"{'case':<40} {'p50 ms':>10} {'p99 ms':>10} {'ops/sec':>12}")
+    for name, r in rows:
+        print(f"{name:<40} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['ops_per_sec']:>12.0f}")
+
+
+def save_baseline(name: str, results: dict[str, dict[str, float]]) -> Path:
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    path.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def load_baseline(name: str) -> dict[str, dict[str, float]] | None:
+    path = BASELINE_DIR / f"{name}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def change(current: float, baseline: float | None) -> str:
+    if not baseline:
+        return "n/a"
+    return f"{(current - baseline) / baseline * 100:+.1f}%"
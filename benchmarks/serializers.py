@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+# Dump/load time and file size for each JsonStore serializer.
+# Usage: python -m benchmarks.serializers [--sizes 100 1000 10000 100000]
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import measure, print_table  # noqa: E402
+from core.serializers import SERIALIZERS, loads  # noqa: E402
+
+
+def case_store(items: int) -> dict:
+    # Shaped like data/cases.json.
+    rng = random.Random(3)
+    return {
+        "next": items + 1,
+        "items": {
+            str(i): {
+                "guild_id": rng.randrange(10**17, 10**18),
+                "target_id": rng.randrange(10**17, 10**18),
+                "actor_id": rng.randrange(10**17, 10**18),
+                "action": rng.choice(["warn", "kick", "ban", "timeout"]),
+                "reason": "Repeated rule violations in #general " * rng.randint(1, 3),
+                "created_at": "2024-05-01T12:00:00+00:00",
+            }
+            for i in range(items)
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare JsonStore serializers across store sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        data = case_store(size)
+        repeat = max(3, 20_000 // size)
+        rows = []
+        sizes = []
+        for name, serializer in SERIALIZERS.items():
+            raw = serializer.dumps(data)
+            assert loads(raw) == data
+            rows.append((f"{name} dump", measure(lambda: serializer.dumps(data), repeat=repeat, warmup=1)))
+            rows.append((f"{name} load", measure(lambda: loads(raw), repeat=repeat, warmup=1)))
+            sizes.append(f"{name}={len(raw):,}B")
+        print_table(f"{size:,} cases ({', '.join(sizes)})", rows)
+
+
+if __name__ == "__main__":
+    main()
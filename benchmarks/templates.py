@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+# Compiled templates vs the old replace-per-variable loop.
+# Usage: python -m benchmarks.templates
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import measure, print_table  # noqa: E402
+from core.templates import compile_template  # noqa: E402
+
+DASHBOARD = "Server: {guild_name}\nMembers: {member_count}\nSession: {session_status}\nPremium: {premium_status}\nUpdated: {timestamp}"
+CASES = {
+    "dashboard (5 slots)": DASHBOARD,
+    "no placeholders": "Welcome to the server! Read the rules and enjoy your stay. " * 4,
+    "no timestamp (2 slots)": "Hello {user}, welcome to {guild_name}!",
+    "long, 40 variables": " ".join(f"{{var{i}}} text" for i in range(40)) * 3,
+}
+EXTRA = {"session_status": "Online", "premium_status": "Premium", **{f"var{i}": f"value {i}" for i in range(40)}}
+
+
+class Guild:
+    name = "Blox Studios"
+    member_count = 1234
+
+
+class User:
+    mention = "<@1234567890>"
+
+
+def legacy_apply(text: str, guild, user, extra: dict[str, str]) -> str:
+    values = {
+        "guild_name": guild.name,
+        "member_count": str(guild.member_count or 0),
+        "user": user.mention,
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+    }
+    values.update(extra)
+    for key, value in values.items():
+        text = text.replace(f"{{{key}}}", value)
+    return text
+
+
+def compiled_apply(text: str, guild, user, extra: dict[str, str]) -> str:
+    # Mirrors core.embeds.apply_variables without importing discord.
+    template = compile_template(text)
+    if not template.names:
+        return text
+    values = {
+        "guild_name": lambda: guild.name,
+        "member_count": lambda: guild.member_count or 0,
+        "user": lambda: user.mention,
+        "timestamp": lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+    }
+    values.update(extra)
+    return template.render(values)
+
+
+def main() -> None:
+    guild, user = Guild(), User()
+    rows = []
+    for name, text in CASES.items():
+        assert legacy_apply(text, guild, user, EXTRA) == compiled_apply(text, guild, user, EXTRA)
+        rows.append((f"{name} legacy", measure(lambda: legacy_apply(text, guild, user, EXTRA), repeat=20_000)))
+        rows.append((f"{name} compiled", measure(lambda: compiled_apply(text, guild, user, EXTRA), repeat=20_000)))
+    print_table("apply_variables", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,14 @@ from pathlib import Path
 import discord
 from discord.ext import commands
 
+from core.analytics import CounterRegistry, TimeSeries
 from core.config import ensure_config
+from core.embeds import BrandingCache
+from core.latency import LatencyRegistry, TimedCommandTree, instrument_http, measure
+from core.metrics import METRICS, MetricsServer, bot_collector
+from core.watchdog import LoopWatchdog
 from core.premium import PremiumManager
-from core.storage import JsonStore
+from core.storage import JsonStore, ShardedJsonStore
 
 COGS = [
     "cogs.owner_panel",
@@ -33,36 +38,128 @@ class BloxBot(commands.Bot):
         self.config = ensure_config()
         intents = discord.Intents.default()
         intents.members = True
-        super().__init__(command_prefix=self.config.get("prefix", "."), intents=intents)
-
-        self.premium = PremiumManager()
-        self.guild_store = JsonStore("data/guilds.json", {})
-        self.warn_store = JsonStore("data/warnings.json", {})
-        self.case_store = JsonStore("data/cases.json", {"next": 1, "items": {}})
-        self.session_store = JsonStore("data/sessions.json", {})
-        self.appeal_store = JsonStore("data/appeals.json", {"next": 1, "items": {}})
-        self.analytics_store = JsonStore("data/analytics.json", {"commands": {}, "events": {}})
+        super().__init__(command_prefix=self.config.get("prefix", "."), intents=intents, tree_cls=TimedCommandTree)
+        self.command_latency = LatencyRegistry()
+        self.metrics_server: MetricsServer | None = None
+        self.loop_watchdog: LoopWatchdog | None = None
+        instrument_http(self)
+
+        storage = self.config.get("storage", {})
+        journal_options = {
+            "journal": storage.get("journal", True),
+            "compact_bytes": storage.get("journal_compact_bytes", 1 << 20),
+            "fsync": storage.get("fsync", False),
+        }
+        store_options = {
+            **journal_options,
+            "write_behind": storage.get("write_behind", True),
+            "flush_interval": storage.get("flush_interval_seconds", 5),
+            "flush_threshold": storage.get("flush_threshold", 50),
+        }
+
+        def serializer(name: str) -> str:
+            return storage.get("store_serializers", {}).get(name, storage.get("serializer", "json"))
+
+        # Premium grants stay write-through; with journaling each one is a small append.
+        self.premium = PremiumManager(**journal_options, serializer=serializer("premium"))
+        shard_options = {
+            "max_cached": storage.get("shard_cache_size", 256),
+            "write_behind": store_options["write_behind"],
+            "flush_interval": store_options["flush_interval"],
+        }
+
+        # Per-guild stores keep one file per guild under data/<name>/.
+        self.guild_store = ShardedJsonStore("data/guilds", legacy_path="data/guilds.json", **shard_options, serializer=serializer("guilds"))
+        self.warn_store = ShardedJsonStore("data/warnings", legacy_path="data/warnings.json", **shard_options, serializer=serializer("warnings"))
+        self.session_store = ShardedJsonStore("data/sessions", legacy_path="data/sessions.json", **shard_options, serializer=serializer("sessions"))
+        self.staff_store = ShardedJsonStore("data/staff", legacy_path="data/staff.json", **shard_options, serializer=serializer("staff"))
+        self.case_store = JsonStore("data/cases.json", {"next": 1, "items": {}}, **store_options, serializer=serializer("cases"))
+        self.appeal_store = JsonStore("data/appeals.json", {"next": 1, "items": {}}, **store_options, serializer=serializer("appeals"))
+        self.analytics_store = JsonStore("data/analytics.json", {"commands": {}, "events": {}}, **store_options, serializer=serializer("analytics"))
+        # Command usage is counted in memory and folded into analytics.json in batches.
+        self.command_counters = CounterRegistry(self.analytics_store, "commands", flush_interval=storage.get("analytics_flush_seconds", 30))
+        # Per-minute usage with hourly/daily rollups, for windowed queries.
+        series = self.config.get("analytics", {})
+        self.timeseries = TimeSeries(
+            series.get("path", "data/analytics.db"),
+            flush_interval=storage.get("analytics_flush_seconds", 30),
+            retention={
+                "minute": series.get("minute_retention_hours", 48) * 3600,
+                "hour": series.get("hour_retention_days", 90) * 86400,
+                "day": series.get("day_retention_days", 0) * 86400 or None,
+            },
+        )
+        self.branding_cache = BrandingCache(self, max_size=storage.get("shard_cache_size", 256))
+        self.named_stores = {
+            "guilds": self.guild_store,
+            "warnings": self.warn_store,
+            "sessions": self.session_store,
+            "staff": self.staff_store,
+            "cases": self.case_store,
+            "appeals": self.appeal_store,
+            "analytics": self.analytics_store,
+            "premium": self.premium.store,
+        }
+        self.stores = [
+            self.guild_store,
+            self.warn_store,
+            self.session_store,
+            self.staff_store,
+            self.case_store,
+            self.appeal_store,
+            self.analytics_store,
+        ]
+
+    async def invoke(self, ctx: commands.Context):
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        with measure(self.command_latency, f"prefix:{ctx.command.qualified_name}"):
+            await super().invoke(ctx)
 
     async def setup_hook(self):
+        watchdog = self.config.get("loop_watchdog", {})
+        if watchdog.get("enabled", True):
+            self.loop_watchdog = LoopWatchdog(watchdog.get("interval_ms", 100) / 1000, watchdog.get("block_threshold_ms", 250) / 1000)
+            self.loop_watchdog.start()
+        for store in self.stores:
+            store.start_flusher()
+        self.command_counters.start_flusher()
+        self.timeseries.start_flusher()
+        metrics = self.config.get("metrics", {})
+        if metrics.get("enabled"):
+            METRICS.add_collector(bot_collector(self))
+            self.metrics_server = MetricsServer(metrics.get("host", "127.0.0.1"), metrics.get("port", 9108))
+            await self.metrics_server.start()
         for cog in COGS:
             await self.load_extension(cog)
         await self.tree.sync()
 
     async def on_command_completion(self, ctx: commands.Context):
-        def updater(data):
-            key = f"prefix:{ctx.command.qualified_name}"
-            data["commands"][key] = data["commands"].get(key, 0) + 1
-            return data
-
-        self.analytics_store.update(updater)
+        key = f"prefix:{ctx.command.qualified_name}"
+        self.command_counters.incr(key)
+        self.timeseries.record(key, ctx.guild.id if ctx.guild else None)
 
     async def on_app_command_completion(self, interaction: discord.Interaction, command: discord.app_commands.Command):
-        def updater(data):
-            key = f"slash:{command.qualified_name}"
-            data["commands"][key] = data["commands"].get(key, 0) + 1
-            return data
-
-        self.analytics_store.update(updater)
+        key = f"slash:{command.qualified_name}"
+        self.command_counters.incr(key)
+        self.timeseries.record(key, interaction.guild_id)
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            if self.loop_watchdog is not None:
+                self.loop_watchdog.stop()
+            # Each step runs on its own so one failure cannot skip a store's final flush.
+            steps = [("command counters", self.command_counters.close), ("analytics time series", self.timeseries.close)]
+            if self.metrics_server is not None:
+                steps.append(("metrics exporter", self.metrics_server.stop))
+            steps += [(str(getattr(store, "path", None) or store.directory), store.close) for store in self.stores]
+            for name, step in steps:
+                try:
+                    await step()
+                except Exception as e:
+                    print(f"Failed to close {name}: {e}")
 
 
 async def main() -> None:
@@ -71,7 +168,8 @@ async def main() -> None:
     token = bot.config.get("token")
     if not token or token == "PUT_TOKEN_HERE":
         raise SystemExit("Set your Discord bot token in config.json (field: token) and restart.")
-    await bot.start(token)
+    async with bot:
+        await bot.start(token)
 
 
 if __name__ == "__main__":
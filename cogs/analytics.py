@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timezone
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from core.embeds import send_embed
+from core.timeparse import parse_duration
+
+
+def window_seconds(period: str) -> float:
+    until = parse_duration(period)
+    if until is None:
+        raise ValueError("Use a bounded period like 30m, 6h, 7d or 1y")
+    return max(60.0, (until - datetime.now(timezone.utc)).total_seconds())
 
 
 class AnalyticsCog(commands.Cog):
@@ -18,15 +29,14 @@ class AnalyticsCog(commands.Cog):
         if interaction.user.id not in self.bot.config.get("owner_ids", []):
             await send_embed(interaction, self.bot, "Owner Only", "This command is owner-only.", ephemeral=True)
             return
-        data = self.bot.analytics_store.read()["commands"]
-        top = sorted(data.items(), key=lambda kv: kv[1], reverse=True)[:20]
+        top = self.bot.command_counters.top(20)
         out = "\n".join([f"{k}: {v}" for k, v in top]) or "No analytics yet."
         await send_embed(interaction, self.bot, "Global Analytics", out[:1900])
 
     @analytics.command(name="guild", description="Per-server analytics summary")
     async def guild(self, interaction: discord.Interaction):
-        sessions = self.bot.session_store.read().get(str(interaction.guild_id), {})
-        warns = self.bot.warn_store.read().get(str(interaction.guild_id), {})
+        sessions = self.bot.session_store.read(interaction.guild_id)
+        warns = self.bot.warn_store.read(interaction.guild_id)
         await send_embed(interaction, self.bot, "Guild Analytics", f"Sessions tracked: {len(sessions)}\nWarned users: {len(warns)}")
 
     @analytics.command(name="premium", description="Premium analytics for this server")
@@ -36,19 +46,78 @@ class AnalyticsCog(commands.Cog):
 
     @analytics.command(name="health", description="Simple bot health metrics")
     async def health(self, interaction: discord.Interaction):
-        await send_embed(interaction, self.bot, "Bot Health", f"Latency={round(self.bot.latency*1000)}ms\nGuilds={len(self.bot.guilds)}\nUsers={sum(g.member_count or 0 for g in self.bot.guilds)}")
+        text = f"Latency={round(self.bot.latency*1000)}ms\nGuilds={len(self.bot.guilds)}\nUsers={sum(g.member_count or 0 for g in self.bot.guilds)}"
+        if self.bot.loop_watchdog is not None:
+            text += "\n" + self.bot.loop_watchdog.format()
+        await send_embed(interaction, self.bot, "Bot Health", text)
+
+    @analytics.command(name="latency", description="Command latency percentiles (owner only)")
+    async def latency(self, interaction: discord.Interaction, minutes: app_commands.Range[int, 1, 60] = 15):
+        if interaction.user.id not in self.bot.config.get("owner_ids", []):
+            await send_embed(interaction, self.bot, "Owner Only", "This command is owner-only.", ephemeral=True)
+            return
+        await send_embed(interaction, self.bot, f"Command Latency (last {minutes}m)", self.bot.command_latency.format(minutes)[:3900], ephemeral=True)
 
     @analytics.command(name="topcommands", description="Top used commands")
     async def topcommands(self, interaction: discord.Interaction):
-        data = self.bot.analytics_store.read()["commands"]
-        top = sorted(data.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        top = self.bot.command_counters.top(10)
         out = "\n".join([f"{k}: {v}" for k, v in top]) or "No command usage yet."
         await send_embed(interaction, self.bot, "Top Commands", out[:1900])
 
+    async def _series(self, fn, *args, **kwargs):
+        # Fold pending counts in first so the window includes the last few seconds;
+        # if that fails, answer from what is already committed.
+        try:
+            await asyncio.to_thread(self.bot.timeseries.flush)
+        except Exception as e:
+            print(f"Failed to flush analytics time series: {e}")
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    @analytics.command(name="recent", description="Top commands over a recent period, e.g. 1h, 24h, 7d")
+    async def recent(self, interaction: discord.Interaction, period: str = "1h", everywhere: bool = False):
+        if everywhere and interaction.user.id not in self.bot.config.get("owner_ids", []):
+            await send_embed(interaction, self.bot, "Owner Only", "Bot-wide analytics are owner-only.", ephemeral=True)
+            return
+        try:
+            window = window_seconds(period)
+        except ValueError as e:
+            await send_embed(interaction, self.bot, "Recent Commands", str(e), ephemeral=True)
+            return
+        top = await self._series(self.bot.timeseries.top, window, None if everywhere else interaction.guild_id, 15)
+        out = "\n".join([f"{k}: {v}" for k, v in top]) or "No command usage in this period."
+        await send_embed(interaction, self.bot, f"Top Commands ({period})", out[:1900])
+
+    @analytics.command(name="trend", description="Usage of one command key over time")
+    async def trend(self, interaction: discord.Interaction, key: str, period: str = "24h"):
+        try:
+            window = window_seconds(period)
+        except ValueError as e:
+            await send_embed(interaction, self.bot, "Command Trend", str(e), ephemeral=True)
+            return
+        table, rows = await self._series(self.bot.timeseries.series, key, window, interaction.guild_id)
+        fmt = {"minute": "%H:%M", "hour": "%m-%d %H:00", "day": "%Y-%m-%d"}[table]
+        peak = max((n for _, n in rows), default=0)
+        lines = [
+            f"`{datetime.fromtimestamp(bucket, timezone.utc).strftime(fmt)}` {'█' * max(1, round(n / peak * 20))} {n}"
+            for bucket, n in rows[-30:]
+        ]
+        body = "\n".join(lines) or "No usage in this period."
+        await send_embed(interaction, self.bot, f"{key} per {table} ({period})", f"Total: {sum(n for _, n in rows)}\n{body}"[:3900])
+
+    @analytics.command(name="spikes", description="Commands used far more in the last hour than the day before")
+    async def spikes(self, interaction: discord.Interaction):
+        if interaction.user.id not in self.bot.config.get("owner_ids", []):
+            await send_embed(interaction, self.bot, "Owner Only", "This command is owner-only.", ephemeral=True)
+            return
+        rows = await self._series(self.bot.timeseries.spikes)
+        out = "\n".join(
+            f"{k}: {n} in the last hour ({'new' if ratio == float('inf') else f'{ratio:.1f}x usual'})" for k, n, ratio in rows
+        ) or "No command usage in the last hour."
+        await send_embed(interaction, self.bot, "Usage Spikes", out[:1900])
+
     @analytics.command(name="command", description="Show usage for one command key")
     async def command(self, interaction: discord.Interaction, key: str):
-        data = self.bot.analytics_store.read()["commands"]
-        await send_embed(interaction, self.bot, "Command Usage", f"{key}: {data.get(key, 0)} uses")
+        await send_embed(interaction, self.bot, "Command Usage", f"{key}: {self.bot.command_counters.get(key)} uses")
 
 
 async def setup(bot):
@@ -44,7 +44,7 @@ class APICog(commands.Cog):
         return self.bot.erlc if provider == "erlc" else self.bot.maple
 
     async def _run_action(self, interaction: discord.Interaction, provider: str, action_key: str, params: dict):
-        cfg = self.bot.db.get_guild_config(interaction.guild_id)
+        cfg = await self.bot.db.get_guild_config(interaction.guild_id)
         if not cfg["api_actions_enabled"]:
             await interaction.response.send_message(embed=themed_embed("API Actions", "API actions disabled in config.", success=False), ephemeral=True)
             return
@@ -53,7 +53,7 @@ class APICog(commands.Cog):
             return
 
         result = await self._client(provider).run_action(action_key, params)
-        self.bot.db.log_api_action(
+        await self.bot.db.log_api_action(
             interaction.guild_id,
             interaction.user.id,
             provider,
@@ -62,6 +62,17 @@ class APICog(commands.Cog):
             json.dumps(result),
             utc_now_iso(),
         )
+        rendered = await self.bot.templates.render(interaction.guild_id, "api_action_result", {
+            "user": interaction.user.mention,
+            "provider": provider.upper(),
+            "action": action_key,
+            "target": params.get("player_name", "n/a"),
+            "result": result.get("message", result),
+        })
+        if rendered:
+            content, embeds = rendered
+            await interaction.response.send_message(content=content, embeds=embeds)
+            return
         await interaction.response.send_message(embed=themed_embed("Game Action Result", f"{provider.upper()} action `{action_key}` result:\n{result.get('message', result)}"))
 
     @erlc.command(name="status")
@@ -86,13 +97,13 @@ class APICog(commands.Cog):
 
     @game.command(name="status")
     async def game_status(self, interaction: discord.Interaction):
-        cfg = self.bot.db.get_guild_config(interaction.guild_id)
+        cfg = await self.bot.db.get_guild_config(interaction.guild_id)
         mode = cfg["provider_mode"]
         await interaction.response.send_message(embed=themed_embed("Game Provider", f"Configured provider mode: {mode}"))
 
     @game.command(name="players")
     async def game_players(self, interaction: discord.Interaction):
-        cfg = self.bot.db.get_guild_config(interaction.guild_id)
+        cfg = await self.bot.db.get_guild_config(interaction.guild_id)
         mode = cfg["provider_mode"]
         if mode == "erlc":
             out = await self.bot.erlc.players()
@@ -107,7 +118,7 @@ class APICog(commands.Cog):
 
     @game.command(name="actions")
     async def actions(self, interaction: discord.Interaction):
-        cfg = self.bot.db.get_guild_config(interaction.guild_id)
+        cfg = await self.bot.db.get_guild_config(interaction.guild_id)
         acts = allowed_actions_for_guild(cfg)
         await interaction.response.send_message(embed=themed_embed("Allowed Actions", "\n".join([f"- {a.key}: {a.display}" for a in acts])))
 
@@ -20,11 +20,10 @@ class AppealModal(discord.ui.Modal, title="Submit Appeal"):
         self.user_id = user_id
 
     async def on_submit(self, interaction: discord.Interaction):
-        self.bot.db._exec(
+        aid = await self.bot.db.execute(
             "INSERT INTO appeals (guild_id, user_id, status, reason, evidence, created_at) VALUES (?, ?, 'pending', ?, ?, ?)",
             (self.guild_id, self.user_id, str(self.reason), str(self.evidence), datetime.now(timezone.utc).isoformat()),
         )
-        aid = self.bot.db._exec("SELECT last_insert_rowid()").fetchone()[0]
         await interaction.response.send_message(embed=themed_embed("Appeal Submitted", f"appeal_id={aid}"), ephemeral=True)
 
 
@@ -40,7 +39,7 @@ class AppealCog(commands.Cog):
 
     @appeal.command(name="view")
     async def view(self, interaction: discord.Interaction, appeal_id: int):
-        row = self.bot.db._exec("SELECT * FROM appeals WHERE id=? AND guild_id=?", (appeal_id, interaction.guild_id)).fetchone()
+        row = await self.bot.db.fetchone("SELECT * FROM appeals WHERE id=? AND guild_id=?", (appeal_id, interaction.guild_id))
         if not row:
             await interaction.response.send_message(embed=themed_embed("Appeal View", "Appeal not found.", success=False), ephemeral=True)
             return
@@ -48,7 +47,7 @@ class AppealCog(commands.Cog):
 
     @appeal.command(name="list")
     async def list_(self, interaction: discord.Interaction):
-        rows = self.bot.db._exec("SELECT id, user_id, status FROM appeals WHERE guild_id=? ORDER BY id DESC LIMIT 20", (interaction.guild_id,)).fetchall()
+        rows = await self.bot.db.fetchall("SELECT id, user_id, status FROM appeals WHERE guild_id=? ORDER BY id DESC LIMIT 20", (interaction.guild_id,))
         await interaction.response.send_message(embed=themed_embed("Appeal List", "\n".join([f"#{r['id']} user={r['user_id']} status={r['status']}" for r in rows]) or "No appeals"))
 
 
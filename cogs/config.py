@@ -4,7 +4,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from core.embeds import build_embed
+from core.embeds import BRANDING_KEYS, build_embed, invalidate_branding
 
 
 class ConfigEditModal(discord.ui.Modal, title="Edit Server Config"):
@@ -34,8 +34,7 @@ class ConfigEditModal(discord.ui.Modal, title="Edit Server Config"):
 
         parts = [p for p in key_path.split(".") if p]
 
-        def updater(data):
-            g = data.get(str(self.guild_id), {})
+        def updater(g):
             cur = g
             for part in parts[:-1]:
                 nxt = cur.get(part)
@@ -44,10 +43,11 @@ class ConfigEditModal(discord.ui.Modal, title="Edit Server Config"):
                     cur[part] = nxt
                 cur = nxt
             cur[parts[-1]] = parsed
-            data[str(self.guild_id)] = g
-            return data
+            return g
 
-        self.cog.bot.guild_store.update(updater)
+        self.cog.bot.guild_store.update(self.guild_id, updater)
+        if parts[0] in BRANDING_KEYS:
+            invalidate_branding(self.cog.bot, self.guild_id)
         embed = self.cog.make_config_embed(self.guild_id)
         await interaction.response.send_message(f"Updated `{key_path}`.", embed=embed, ephemeral=True)
 
@@ -74,7 +74,7 @@ class ConfigView(discord.ui.View):
     )
     async def category_select(self, interaction: discord.Interaction, select: discord.ui.Select):
         cat = select.values[0]
-        data = self.cog.bot.guild_store.read().get(str(self.guild_id), {})
+        data = self.cog.bot.guild_store.read(self.guild_id)
         if cat == "dashboard":
             subset = {
                 "dashboard_template": data.get("dashboard_template"),
@@ -105,7 +105,7 @@ class ConfigCog(commands.Cog):
         self.bot = bot
 
     def make_config_embed(self, guild_id: int):
-        data = self.bot.guild_store.read().get(str(guild_id), {})
+        data = self.bot.guild_store.read(guild_id)
         guild = self.bot.get_guild(guild_id)
         e = build_embed(self.bot, guild, "Server Config", "All config is managed from this single command.")
         e.add_field(name="Channels", value=f"```py\n{str(data.get('channels', {}))[:900]}\n```", inline=False)
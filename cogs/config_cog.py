@@ -6,18 +6,9 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from utils.embed_templates import validate_discohook_json
+from utils.embed_templates import TEMPLATE_NAMES, validate_discohook_json
 from utils.ui_embeds import config_home_embed, themed_embed
 
-TEMPLATE_NAMES = [
-    "session_start", "session_end", "session_announce",
-    "promotion", "demotion",
-    "infraction_issue", "infraction_update",
-    "appeal_submitted", "appeal_decision",
-    "economy_balance", "economy_transfer", "economy_shop", "economy_admin",
-    "api_action_result", "api_action_log",
-]
-
 PERM_GROUPS = [
     "session_host_roles", "staff_manage_roles", "infraction_roles",
     "appeal_review_roles", "economy_admin_roles", "api_action_roles", "config_admin_roles",
@@ -67,7 +58,8 @@ class TemplateModal(discord.ui.Modal, title="Set Embed Template"):
         except Exception as e:
             await interaction.response.send_message(embed=themed_embed("Invalid Discohook JSON", str(e), success=False), ephemeral=True)
             return
-        self.cog.bot.db.set_template(self.guild_id, name, raw)
+        await self.cog.bot.db.set_template(self.guild_id, name, raw)
+        self.cog.bot.templates.invalidate(self.guild_id, name)
         await interaction.response.send_message(embed=themed_embed("Template Saved", f"Template `{name}` has been saved."), ephemeral=True)
 
 
@@ -79,7 +71,7 @@ class ModuleSelect(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         key = self.values[0]
-        embed = self.cfg_view.cog.build_module_embed(self.cfg_view.guild_id, key)
+        embed = await self.cfg_view.cog.build_module_embed(self.cfg_view.guild_id, key)
         await interaction.response.edit_message(embed=embed, view=self.cfg_view)
 
 
@@ -100,7 +92,7 @@ class ConfigView(discord.ui.View):
 
     @discord.ui.button(label="Back", style=discord.ButtonStyle.success)
     async def back(self, interaction: discord.Interaction, _button: discord.ui.Button):
-        await interaction.response.edit_message(embed=self.cog.build_config_embed(self.guild_id), view=self)
+        await interaction.response.edit_message(embed=await self.cog.build_config_embed(self.guild_id), view=self)
 
 
 class ConfigCog(commands.Cog):
@@ -108,7 +100,7 @@ class ConfigCog(commands.Cog):
         self.bot = bot
 
     async def apply_key_value(self, interaction: discord.Interaction, guild_id: int, key: str, value_text: str):
-        cfg = self.bot.db.get_guild_config(guild_id)
+        cfg = await self.bot.db.get_guild_config(guild_id)
 
         def parse_value(v: str):
             if v.lower() in {"true", "false"}:
@@ -128,41 +120,41 @@ class ConfigCog(commands.Cog):
 
         if key.startswith("channels."):
             k = key.split(".", 1)[1]
-            ch = cfg["channels"]
+            ch = dict(cfg["channels"])
             ch[k] = v
-            self.bot.db.update_guild_config(guild_id, "channels", ch)
+            await self.bot.db.update_guild_config(guild_id, "channels", ch)
         elif key.startswith("module_enabled."):
             k = key.split(".", 1)[1]
-            me = cfg["module_enabled"]
+            me = dict(cfg["module_enabled"])
             me[k] = bool(v)
-            self.bot.db.update_guild_config(guild_id, "module_enabled", me)
+            await self.bot.db.update_guild_config(guild_id, "module_enabled", me)
         elif key == "admins_bypass":
-            self.bot.db.update_guild_config(guild_id, "admins_bypass", bool(v))
+            await self.bot.db.update_guild_config(guild_id, "admins_bypass", bool(v))
         elif key.startswith("variables."):
-            self.bot.db.set_variable(guild_id, key.split(".", 1)[1], str(v))
+            await self.bot.db.set_variable(guild_id, key.split(".", 1)[1], str(v))
         elif key.startswith("permissions."):
             group = key.split(".", 1)[1]
             if group not in PERM_GROUPS or not isinstance(v, list):
                 await interaction.response.send_message(embed=themed_embed("Permission Error", "Use `permissions.<group>` with JSON list of role IDs, e.g. [123,456]", success=False), ephemeral=True)
                 return
-            self.bot.db.set_permission_roles(guild_id, group, [int(x) for x in v])
+            await self.bot.db.set_permission_roles(guild_id, group, [int(x) for x in v])
         elif key.startswith("economy."):
-            eco = cfg["economy_settings"]
+            eco = dict(cfg["economy_settings"])
             eco[key.split(".", 1)[1]] = v
-            self.bot.db.update_guild_config(guild_id, "economy_settings", eco)
+            await self.bot.db.update_guild_config(guild_id, "economy_settings", eco)
         elif key in {"provider_mode", "api_actions_enabled", "require_action_confirmation", "log_all_actions"}:
-            self.bot.db.update_guild_config(guild_id, key, v)
+            await self.bot.db.update_guild_config(guild_id, key, v)
         elif key.startswith("webhook."):
             sub = key.split(".", 1)[1]
             if sub == "name":
-                self.bot.db.update_guild_config(guild_id, "webhook_name", str(v))
+                await self.bot.db.update_guild_config(guild_id, "webhook_name", str(v))
             elif sub == "avatar_url":
-                self.bot.db.update_guild_config(guild_id, "webhook_avatar_url", str(v))
+                await self.bot.db.update_guild_config(guild_id, "webhook_avatar_url", str(v))
             elif sub.startswith("module_"):
-                c = self.bot.db.get_guild_config(guild_id)
-                wm = c.get("webhook_modules", {})
+                c = await self.bot.db.get_guild_config(guild_id)
+                wm = dict(c.get("webhook_modules", {}))
                 wm[sub.replace("module_", "")] = bool(v)
-                self.bot.db.update_guild_config(guild_id, "webhook_modules", wm)
+                await self.bot.db.update_guild_config(guild_id, "webhook_modules", wm)
             else:
                 await interaction.response.send_message(embed=themed_embed("Webhook Error", "Unknown webhook key path.", success=False), ephemeral=True)
                 return
@@ -170,15 +162,15 @@ class ConfigCog(commands.Cog):
             if not isinstance(v, list):
                 await interaction.response.send_message(embed=themed_embed("Config Error", "allowed_actions must be JSON list", success=False), ephemeral=True)
                 return
-            self.bot.db.update_guild_config(guild_id, "allowed_actions", v)
+            await self.bot.db.update_guild_config(guild_id, "allowed_actions", v)
         else:
             await interaction.response.send_message(embed=themed_embed("Unknown Key", "Unknown key path. Use channels./permissions./variables./economy./webhook./module_enabled.", success=False), ephemeral=True)
             return
 
         await interaction.response.send_message(embed=themed_embed("Config Updated", f"Saved `{key}` successfully."), ephemeral=True)
 
-    def build_config_embed(self, guild_id: int) -> discord.Embed:
-        cfg = self.bot.db.get_guild_config(guild_id)
+    async def build_config_embed(self, guild_id: int) -> discord.Embed:
+        cfg = await self.bot.db.get_guild_config(guild_id)
         module_states = {
             "default": True,
             "infractions": cfg["module_enabled"].get("infractions", True),
@@ -190,35 +182,35 @@ class ConfigCog(commands.Cog):
         }
         return config_home_embed(module_states)
 
-    def build_module_embed(self, guild_id: int, module_key: str) -> discord.Embed:
-        cfg = self.bot.db.get_guild_config(guild_id)
-        vars_map = self.bot.db.get_variables(guild_id)
+    async def build_module_embed(self, guild_id: int, module_key: str) -> discord.Embed:
+        cfg = await self.bot.db.get_guild_config(guild_id)
+        vars_map = await self.bot.db.get_variables(guild_id)
         if module_key == "infractions":
-            body = f"module_enabled.infractions = {cfg['module_enabled'].get('infractions', True)}\ninfraction_roles = {self.bot.db.get_permission_roles(guild_id, 'infraction_roles')}\ninfraction_logs_channel = {cfg['channels'].get('infraction_logs_channel')}"
+            body = f"module_enabled.infractions = {cfg['module_enabled'].get('infractions', True)}\ninfraction_roles = {list(await self.bot.db.get_permission_roles(guild_id, 'infraction_roles'))}\ninfraction_logs_channel = {cfg['channels'].get('infraction_logs_channel')}"
             return themed_embed("Infraction Module", f"```py\n{body}\n```")
         if module_key == "appeals":
-            body = f"module_enabled.appeals = {cfg['module_enabled'].get('appeals', True)}\nappeal_review_roles = {self.bot.db.get_permission_roles(guild_id, 'appeal_review_roles')}\nappeals_channel = {cfg['channels'].get('appeals_channel')}"
+            body = f"module_enabled.appeals = {cfg['module_enabled'].get('appeals', True)}\nappeal_review_roles = {list(await self.bot.db.get_permission_roles(guild_id, 'appeal_review_roles'))}\nappeals_channel = {cfg['channels'].get('appeals_channel')}"
             return themed_embed("Review Module", f"```py\n{body}\n```")
         if module_key == "economy":
-            return themed_embed("Orders Module", f"```py\n{cfg['economy_settings']}\n```")
+            return themed_embed("Orders Module", f"```py\n{dict(cfg['economy_settings'])}\n```")
         if module_key == "staff":
-            body = f"module_enabled.staff = {cfg['module_enabled'].get('staff', True)}\nstaff_manage_roles = {self.bot.db.get_permission_roles(guild_id, 'staff_manage_roles')}\nstaff_logs_channel = {cfg['channels'].get('staff_logs_channel')}"
+            body = f"module_enabled.staff = {cfg['module_enabled'].get('staff', True)}\nstaff_manage_roles = {list(await self.bot.db.get_permission_roles(guild_id, 'staff_manage_roles'))}\nstaff_logs_channel = {cfg['channels'].get('staff_logs_channel')}"
             return themed_embed("Staff Management Module", f"```py\n{body}\n```")
         if module_key == "api":
-            body = f"module_enabled.api = {cfg['module_enabled'].get('api', True)}\nprovider_mode = {cfg['provider_mode']}\nallowed_actions = {cfg.get('allowed_actions', [])}"
+            body = f"module_enabled.api = {cfg['module_enabled'].get('api', True)}\nprovider_mode = {cfg['provider_mode']}\nallowed_actions = {list(cfg.get('allowed_actions', []))}"
             return themed_embed("API Actions Module", f"```py\n{body}\n```")
         if module_key == "sessions":
-            body = f"module_enabled.sessions = {cfg['module_enabled'].get('sessions', True)}\nsession_host_roles = {self.bot.db.get_permission_roles(guild_id, 'session_host_roles')}\nsession_announce_channel = {cfg['channels'].get('session_announce_channel')}"
+            body = f"module_enabled.sessions = {cfg['module_enabled'].get('sessions', True)}\nsession_host_roles = {list(await self.bot.db.get_permission_roles(guild_id, 'session_host_roles'))}\nsession_announce_channel = {cfg['channels'].get('session_announce_channel')}"
             return themed_embed("Session Module", f"```py\n{body}\n```")
         # default
-        body = f"channels = {cfg['channels']}\nvariables = {vars_map}\nadmins_bypass = {cfg['admins_bypass']}\ntemplates = {TEMPLATE_NAMES}"
+        body = f"channels = {dict(cfg['channels'])}\nvariables = {dict(vars_map)}\nadmins_bypass = {cfg['admins_bypass']}\ntemplates = {TEMPLATE_NAMES}"
         return themed_embed("Default Settings", f"```py\n{body}\n```")
 
     config = app_commands.Group(name="config", description="GUI config panel")
 
     @config.command(name="open", description="Open the main config GUI")
     async def open(self, interaction: discord.Interaction):
-        await interaction.response.send_message(embed=self.build_config_embed(interaction.guild_id), view=ConfigView(self, interaction.guild_id), ephemeral=True)
+        await interaction.response.send_message(embed=await self.build_config_embed(interaction.guild_id), view=ConfigView(self, interaction.guild_id), ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
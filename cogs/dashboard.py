@@ -1,153 +1,219 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 
-from core.embeds import apply_variables, build_embed, send_embed
+from core.dashboard import DashboardRefresher, embed_digest
+from core.embeds import apply_variables, build_embed, invalidate_branding, send_embed, send_embed_followup
+from core.metrics import METRICS
+from core.templates import compile_template
+from core.widgets import WidgetPipeline, WidgetProvider
+
+MIN_REFRESH_SECONDS = 30
+DEFAULT_TEMPLATE = "Server: {guild_name}\nMembers: {member_count}\nSession: {session_status}\nPremium: {premium_status}\nUpdated: {timestamp}"
 
 
 class DashboardCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.loop.start()
-
-    def cog_unload(self):
-        self.loop.cancel()
+        self.widgets = WidgetPipeline(bot, timeout=bot.config.get("dashboard_widget_timeout_seconds", 2))
+        self.refresher = DashboardRefresher(
+            bot,
+            bot.guild_store,
+            self.render,
+            self.interval,
+            workers=bot.config.get("dashboard_workers", 8),
+            edits_per_second=bot.config.get("dashboard_edits_per_second", 40),
+            max_staleness=bot.config.get("dashboard_max_staleness_seconds", 900),
+        )
+        self._starter: asyncio.Task | None = None
+        bot.premium.listeners.append(self.refresher.reschedule)
+        METRICS.add_collector(self.refresher.collect)
+
+    async def cog_load(self):
+        self._starter = asyncio.create_task(self._start_when_ready())
+
+    async def _start_when_ready(self):
+        # Schedule after ready so jittered offsets are not spent waiting for the guild cache.
+        await self.bot.wait_until_ready()
+        self.refresher.load_links()
+        self.refresher.start()
+
+    async def cog_unload(self):
+        if self._starter is not None:
+            self._starter.cancel()
+        self.refresher.stop()
+        if self.refresher.reschedule in self.bot.premium.listeners:
+            self.bot.premium.listeners.remove(self.refresher.reschedule)
+        METRICS.remove_collector(self.refresher.collect)
+        await self.widgets.close()
+
+    def interval(self, guild_id: int) -> float:
+        override = self.bot.guild_store.read(guild_id).get("dashboard_refresh_seconds")
+        if override:
+            return max(MIN_REFRESH_SECONDS, override)
+        if self.bot.premium.is_active(guild_id):
+            return max(MIN_REFRESH_SECONDS, self.bot.config.get("dashboard_premium_refresh_seconds", 60))
+        return max(MIN_REFRESH_SECONDS, self.bot.config.get("dashboard_refresh_seconds", 120))
+
+    async def render(self, guild: discord.Guild, user: discord.abc.User | None = None, title: str = "Live Dashboard") -> tuple[discord.Embed, str]:
+        # Returns the embed and a digest of it rendered with the clock blanked,
+        # so the digest only changes with real content.
+        widgets = await self.widgets.collect(guild)
+        template = self.bot.guild_store.read(guild.id).get("dashboard_template", DEFAULT_TEMPLATE)
+        extra = {
+            "session_status": "Online",
+            "premium_status": "Premium" if self.bot.premium.is_active(guild.id) else "Free",
+        }
+        for values in widgets.values():
+            extra.update(values)
+        user = user or guild.me
+        embed = self._compose(guild, user, title, template, extra, widgets)
+        stable = self._compose(guild, user, title, template, {**extra, "timestamp": ""}, widgets)
+        return embed, embed_digest(stable)
+
+    def _compose(self, guild, user, title, template, extra, widgets: dict[WidgetProvider, dict[str, str]]) -> discord.Embed:
+        embed = build_embed(self.bot, guild, title, apply_variables(template, guild, user, extra))
+        used = compile_template(template).names
+        # Enabled widgets the template does not mention get a field of their own.
+        for provider, values in widgets.items():
+            if used.isdisjoint(provider.keys):
+                embed.add_field(name=provider.label, value=provider.summary(values), inline=True)
+        return embed
 
     dash = app_commands.Group(name="dashboard", description="Dashboard system")
 
     @dash.command(name="post", description="Post live dashboard embed")
     async def post(self, interaction: discord.Interaction):
-        conf = self.bot.guild_store.read().get(str(interaction.guild_id), {})
-        status = "Premium" if self.bot.premium.is_active(interaction.guild_id) else "Free"
-        desc = conf.get("dashboard_template", "Server: {guild_name}\nMembers: {member_count}\nSession: {session_status}\nPremium: {premium_status}\nUpdated: {timestamp}")
-        desc = apply_variables(desc, interaction.guild, interaction.user, {
-            "session_status": "Online",
-            "premium_status": status,
-        })
-        e = build_embed(self.bot, interaction.guild, "Live Dashboard", desc)
-        msg = await interaction.channel.send(embed=e)
+        await interaction.response.defer(ephemeral=True)
+        embed, digest = await self.render(interaction.guild, interaction.user)
+        msg = await interaction.channel.send(embed=embed)
 
-        def updater(data):
-            gc = data.get(str(interaction.guild_id), {})
+        def updater(gc):
             gc["dashboard_message_id"] = msg.id
             gc["dashboard_channel_id"] = interaction.channel_id
-            data[str(interaction.guild_id)] = gc
-            return data
+            return gc
 
-        self.bot.guild_store.update(updater)
-        await send_embed(interaction, self.bot, "Dashboard Linked", "Dashboard posted and linked.", ephemeral=True)
+        self.bot.guild_store.update(interaction.guild_id, updater)
+        self.refresher.link(interaction.guild_id, interaction.channel_id, msg.id, digest)
+        await send_embed_followup(interaction, self.bot, "Dashboard Linked", "Dashboard posted and linked.", ephemeral=True)
 
     @dash.command(name="template", description="Set dashboard template")
     async def template(self, interaction: discord.Interaction, template: str):
-        def updater(data):
-            gc = data.get(str(interaction.guild_id), {})
+        def updater(gc):
             gc["dashboard_template"] = template
-            data[str(interaction.guild_id)] = gc
-            return data
+            return gc
 
-        self.bot.guild_store.update(updater)
+        self.bot.guild_store.update(interaction.guild_id, updater)
+        self.refresher.reschedule(interaction.guild_id)
         await send_embed(interaction, self.bot, "Dashboard Template", "Dashboard template updated.")
 
     @dash.command(name="toggle_widget", description="Toggle dashboard widgets")
     async def toggle_widget(self, interaction: discord.Interaction, widget: str, enabled: bool):
-        def updater(data):
-            gc = data.get(str(interaction.guild_id), {})
+        if widget not in self.widgets.providers:
+            names = ", ".join(f"`{name}`" for name in self.widgets.providers)
+            await send_embed(interaction, self.bot, "Dashboard Widget", f"Unknown widget `{widget}`. Available: {names}", ephemeral=True)
+            return
+
+        def updater(gc):
             widgets = gc.get("widgets", {})
             widgets[widget] = enabled
             gc["widgets"] = widgets
-            data[str(interaction.guild_id)] = gc
-            return data
+            return gc
 
-        self.bot.guild_store.update(updater)
+        self.bot.guild_store.update(interaction.guild_id, updater)
+        self.widgets.invalidate(interaction.guild_id, widget)
+        self.refresher.reschedule(interaction.guild_id)
         await send_embed(interaction, self.bot, "Dashboard Widget", f"Widget `{widget}` set to {enabled}")
 
     @dash.command(name="embed_style", description="Customize dashboard embed style")
     async def embed_style(self, interaction: discord.Interaction, color: str, footer: str = "", author: str = ""):
         color_int = int(color.replace("#", ""), 16)
 
-        def updater(data):
-            gc = data.get(str(interaction.guild_id), {})
+        def updater(gc):
             gc["embed_style"] = {"color": color_int, "footer": footer, "author": author}
-            data[str(interaction.guild_id)] = gc
-            return data
+            return gc
 
-        self.bot.guild_store.update(updater)
+        self.bot.guild_store.update(interaction.guild_id, updater)
+        invalidate_branding(self.bot, interaction.guild_id)
+        self.refresher.reschedule(interaction.guild_id)
         await send_embed(interaction, self.bot, "Dashboard Style", "Style updated.")
 
     @dash.command(name="reset", description="Reset dashboard settings")
     async def reset(self, interaction: discord.Interaction):
-        def updater(data):
-            data[str(interaction.guild_id)] = {}
-            return data
-
-        self.bot.guild_store.update(updater)
+        self.bot.guild_store.write(interaction.guild_id, {})
+        self.refresher.unlink(interaction.guild_id)
+        self.widgets.invalidate(interaction.guild_id)
+        invalidate_branding(self.bot, interaction.guild_id)
         await send_embed(interaction, self.bot, "Dashboard Reset", "Dashboard settings reset.")
 
     @dash.command(name="preview", description="Preview dashboard embed without posting")
     async def preview(self, interaction: discord.Interaction):
-        conf = self.bot.guild_store.read().get(str(interaction.guild_id), {})
-        status = "Premium" if self.bot.premium.is_active(interaction.guild_id) else "Free"
-        desc = conf.get("dashboard_template", "Server: {guild_name}\nMembers: {member_count}\nSession: {session_status}\nPremium: {premium_status}\nUpdated: {timestamp}")
-        desc = apply_variables(desc, interaction.guild, interaction.user, {"session_status": "Online", "premium_status": status})
-        e = build_embed(self.bot, interaction.guild, "Dashboard Preview", desc)
-        await interaction.response.send_message(embed=e, ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+        e, _ = await self.render(interaction.guild, interaction.user, "Dashboard Preview")
+        await interaction.followup.send(embed=e, ephemeral=True)
+
+    @dash.command(name="game", description="Link a Roblox experience for the game widget (0 = unlink)")
+    async def game(self, interaction: discord.Interaction, universe_id: int):
+        def updater(gc):
+            if universe_id > 0:
+                gc["roblox_universe_id"] = universe_id
+            else:
+                gc.pop("roblox_universe_id", None)
+            return gc
+
+        self.bot.guild_store.update(interaction.guild_id, updater)
+        self.widgets.invalidate(interaction.guild_id, "game")
+        self.refresher.reschedule(interaction.guild_id)
+        await send_embed(interaction, self.bot, "Dashboard Game", f"Game widget universe set to `{universe_id}`." if universe_id > 0 else "Game widget unlinked.")
 
     @dash.command(name="refresh_now", description="Force refresh the linked dashboard message")
     async def refresh_now(self, interaction: discord.Interaction):
-        conf = self.bot.guild_store.read().get(str(interaction.guild_id), {})
-        message_id = conf.get("dashboard_message_id")
-        channel_id = conf.get("dashboard_channel_id")
-        if not message_id or not channel_id:
+        if interaction.guild_id not in self.refresher.links:
             await send_embed(interaction, self.bot, "Dashboard Refresh", "No linked dashboard message found.", ephemeral=True)
             return
-        channel = interaction.guild.get_channel(channel_id)
-        if not channel:
-            await send_embed(interaction, self.bot, "Dashboard Refresh", "Configured dashboard channel not found.", ephemeral=True)
-            return
-        try:
-            msg = await channel.fetch_message(message_id)
-        except discord.NotFound:
-            await send_embed(interaction, self.bot, "Dashboard Refresh", "Dashboard message no longer exists.", ephemeral=True)
-            return
-        status = "Premium" if self.bot.premium.is_active(interaction.guild_id) else "Free"
-        desc = conf.get("dashboard_template", "Server: {guild_name}\nMembers: {member_count}\nSession: {session_status}\nPremium: {premium_status}\nUpdated: {timestamp}")
-        desc = apply_variables(desc, interaction.guild, interaction.user, {"session_status": "Online", "premium_status": status})
-        await msg.edit(embed=build_embed(self.bot, interaction.guild, "Live Dashboard", desc))
-        await send_embed(interaction, self.bot, "Dashboard Refresh", "Dashboard refreshed.", ephemeral=True)
-
-    @tasks.loop(seconds=120)
-    async def loop(self):
-        guild_data = self.bot.guild_store.read()
-        for guild_id, conf in guild_data.items():
-            message_id = conf.get("dashboard_message_id")
-            channel_id = conf.get("dashboard_channel_id")
-            if not message_id or not channel_id:
-                continue
-            guild = self.bot.get_guild(int(guild_id))
-            if not guild:
-                continue
-            channel = guild.get_channel(channel_id)
-            if not channel:
-                continue
-            try:
-                msg = await channel.fetch_message(message_id)
-            except discord.NotFound:
-                continue
-            desc = conf.get("dashboard_template", "Server: {guild_name}\nMembers: {member_count}\nPremium: {premium_status}\nUpdated: {timestamp}")
-            desc = apply_variables(desc, guild, guild.me, {
-                "session_status": "Online",
-                "premium_status": "Premium" if self.bot.premium.is_active(int(guild_id)) else "Free",
-            })
-            e = build_embed(self.bot, guild, "Live Dashboard", desc)
-            e.timestamp = datetime.now(timezone.utc)
-            try:
-                await msg.edit(embed=e)
-            except discord.Forbidden:
-                pass
+        await interaction.response.defer(ephemeral=True)
+        result = await self.refresher.refresh(interaction.guild_id, force=True)
+        messages = {
+            "ok": "Dashboard refreshed.",
+            "not_found": "Dashboard message no longer exists.",
+            "forbidden": "Missing permission to edit the dashboard message.",
+        }
+        await send_embed_followup(interaction, self.bot, "Dashboard Refresh", messages.get(result, f"Dashboard refresh failed ({result})."), ephemeral=True)
+
+    @dash.command(name="interval", description="Set how often this server's dashboard refreshes (0 = default)")
+    async def set_interval(self, interaction: discord.Interaction, seconds: int):
+        def updater(gc):
+            if seconds > 0:
+                gc["dashboard_refresh_seconds"] = max(MIN_REFRESH_SECONDS, seconds)
+            else:
+                gc.pop("dashboard_refresh_seconds", None)
+            return gc
+
+        self.bot.guild_store.update(interaction.guild_id, updater)
+        self.refresher.reschedule(interaction.guild_id)
+        await send_embed(interaction, self.bot, "Dashboard Interval", f"Dashboard refreshes every **{self.interval(interaction.guild_id):.0f}s**.")
+
+    @dash.command(name="stats", description="Show dashboard refresh engine stats")
+    async def stats(self, interaction: discord.Interaction):
+        s = self.refresher.stats()
+        errors = ", ".join(f"{k}: {v}" for k, v in sorted(s["errors"].items())) or "none"
+        next_due = self.refresher.next_due(interaction.guild_id)
+        desc = (
+            f"Linked dashboards: **{s['linked']}**\n"
+            f"Workers: **{s['workers']}** | Backlog: **{s['backlog']}**\n"
+            f"Refresh time: p50 **{s['refresh_p50_ms']:.0f} ms**, p95 **{s['refresh_p95_ms']:.0f} ms** (edit p95 {s['edit_p95_ms']:.0f} ms)\n"
+            f"Scheduler lag p95: **{s['lag_p95_ms']:.0f} ms**\n"
+            f"Dispatched: {s['dispatched']} | Edits: {s['edits']} | Unchanged: {s['unchanged']} | Skipped: {s['skipped']}\n"
+            f"Errors: {errors}\n"
+            f"Widget timeouts: {dict(self.widgets.timeouts) or 'none'} | failures: {dict(self.widgets.failures) or 'none'}\n"
+            f"This server: every **{self.interval(interaction.guild_id):.0f}s**"
+            + (f", next in {max(0.0, next_due):.0f}s" if next_due is not None else ", not linked")
+        )
+        await send_embed(interaction, self.bot, "Dashboard Stats", desc, ephemeral=True)
 
 
 async def setup(bot):
@@ -32,7 +32,7 @@ class AddItemModal(discord.ui.Modal, title="Add Shop Item"):
         self.guild_id = guild_id
 
     async def on_submit(self, interaction: discord.Interaction):
-        self.cog.bot.db.add_shop_item(self.guild_id, str(self.name), int(str(self.price)), str(self.description))
+        await self.cog.bot.db.add_shop_item(self.guild_id, str(self.name), int(str(self.price)), str(self.description))
         await interaction.response.send_message("Item added.", ephemeral=True)
 
 
@@ -44,39 +44,29 @@ class EconomyCog(commands.Cog):
 
     @economy.command(name="balance")
     async def balance(self, interaction: discord.Interaction):
-        bal = self.bot.db.get_balance(interaction.guild_id, interaction.user.id)
-        cur = self.bot.db.get_guild_config(interaction.guild_id)["economy_settings"]["currency_name"]
+        bal = await self.bot.db.get_balance(interaction.guild_id, interaction.user.id)
+        cur = (await self.bot.db.get_guild_config(interaction.guild_id))["economy_settings"]["currency_name"]
         await interaction.response.send_message(embed=themed_embed("Economy Balance", f"Balance: **{bal} {cur}**"))
 
     @economy.command(name="daily")
     async def daily(self, interaction: discord.Interaction):
-        cfg = self.bot.db.get_guild_config(interaction.guild_id)["economy_settings"]
-        cd = self.bot.db.get_cooldowns(interaction.guild_id, interaction.user.id)
+        cfg = (await self.bot.db.get_guild_config(interaction.guild_id))["economy_settings"]
         now = datetime.now(timezone.utc)
-        if cd["daily_at"]:
-            last = datetime.fromisoformat(cd["daily_at"])
-            if now - last < timedelta(hours=cfg["daily_cooldown_h"]):
-                left = timedelta(hours=cfg["daily_cooldown_h"]) - (now - last)
-                await interaction.response.send_message(embed=themed_embed("Daily Cooldown", f"Daily on cooldown: {left}", success=False), ephemeral=True)
-                return
-        self.bot.db.change_balance(interaction.guild_id, interaction.user.id, cfg["daily_amount"])
-        self.bot.db.set_cooldown(interaction.guild_id, interaction.user.id, "daily_at", now.isoformat())
+        left = await self.bot.db.claim_reward(interaction.guild_id, interaction.user.id, "daily_at", cfg["daily_amount"], timedelta(hours=cfg["daily_cooldown_h"]), now)
+        if left is not None:
+            await interaction.response.send_message(embed=themed_embed("Daily Cooldown", f"Daily on cooldown: {left}", success=False), ephemeral=True)
+            return
         await interaction.response.send_message(embed=themed_embed("Daily Claimed", f"You claimed +{cfg['daily_amount']}"))
 
     @economy.command(name="work")
     async def work(self, interaction: discord.Interaction):
-        cfg = self.bot.db.get_guild_config(interaction.guild_id)["economy_settings"]
-        cd = self.bot.db.get_cooldowns(interaction.guild_id, interaction.user.id)
+        cfg = (await self.bot.db.get_guild_config(interaction.guild_id))["economy_settings"]
         now = datetime.now(timezone.utc)
-        if cd["work_at"]:
-            last = datetime.fromisoformat(cd["work_at"])
-            if now - last < timedelta(minutes=cfg["work_cooldown_m"]):
-                left = timedelta(minutes=cfg["work_cooldown_m"]) - (now - last)
-                await interaction.response.send_message(embed=themed_embed("Work Cooldown", f"Work on cooldown: {left}", success=False), ephemeral=True)
-                return
         gain = random.randint(cfg["work_min"], cfg["work_max"])
-        self.bot.db.change_balance(interaction.guild_id, interaction.user.id, gain)
-        self.bot.db.set_cooldown(interaction.guild_id, interaction.user.id, "work_at", now.isoformat())
+        left = await self.bot.db.claim_reward(interaction.guild_id, interaction.user.id, "work_at", gain, timedelta(minutes=cfg["work_cooldown_m"]), now)
+        if left is not None:
+            await interaction.response.send_message(embed=themed_embed("Work Cooldown", f"Work on cooldown: {left}", success=False), ephemeral=True)
+            return
         await interaction.response.send_message(embed=themed_embed("Work Complete", f"Work payout: +{gain}"))
 
     @economy.command(name="pay")
@@ -84,48 +74,42 @@ class EconomyCog(commands.Cog):
         if amount <= 0:
             await interaction.response.send_message(embed=themed_embed("Transfer Error", "Amount must be positive.", success=False), ephemeral=True)
             return
-        cfg = self.bot.db.get_guild_config(interaction.guild_id)["economy_settings"]
+        cfg = (await self.bot.db.get_guild_config(interaction.guild_id))["economy_settings"]
         if amount > cfg["transfer_max"]:
             await interaction.response.send_message(embed=themed_embed("Transfer Error", "Over transfer max limit.", success=False), ephemeral=True)
             return
-        bal = self.bot.db.get_balance(interaction.guild_id, interaction.user.id)
-        if bal < amount:
-            await interaction.response.send_message(embed=themed_embed("Transfer Error", "Insufficient funds.", success=False), ephemeral=True)
-            return
         tax = int(amount * (cfg.get("transfer_tax_percent", 0) / 100))
         recv = amount - tax
-        self.bot.db.change_balance(interaction.guild_id, interaction.user.id, -amount)
-        self.bot.db.change_balance(interaction.guild_id, user.id, recv)
+        if not await self.bot.db.transfer_balance(interaction.guild_id, interaction.user.id, user.id, amount, recv):
+            await interaction.response.send_message(embed=themed_embed("Transfer Error", "Insufficient funds.", success=False), ephemeral=True)
+            return
         await interaction.response.send_message(embed=themed_embed("Transfer Complete", f"Paid {user.mention} {recv} (tax {tax})"))
 
     @economy.command(name="leaderboard")
     async def leaderboard(self, interaction: discord.Interaction):
-        rows = self.bot.db.top_balances(interaction.guild_id)
+        rows = await self.bot.db.top_balances(interaction.guild_id)
         lines = [f"{i+1}. <@{r['user_id']}> - {r['balance']}" for i, r in enumerate(rows)]
         await interaction.response.send_message(embed=themed_embed("Economy Leaderboard", "\n".join(lines) or "No data"))
 
     @economy.command(name="shop")
     async def shop(self, interaction: discord.Interaction):
-        rows = self.bot.db.list_shop_items(interaction.guild_id)
+        rows = await self.bot.db.list_shop_items(interaction.guild_id)
         await interaction.response.send_message(embed=themed_embed("Economy Shop", "\n".join([f"#{r['id']} {r['name']} - {r['price']}" for r in rows]) or "Shop empty"))
 
     @economy.command(name="buy")
     async def buy(self, interaction: discord.Interaction, item_id: int):
-        row = self.bot.db._exec("SELECT * FROM economy_shop_items WHERE guild_id=? AND id=?", (interaction.guild_id, item_id)).fetchone()
+        row, bought = await self.bot.db.buy_item(interaction.guild_id, interaction.user.id, item_id)
         if not row:
             await interaction.response.send_message(embed=themed_embed("Shop Error", "Item not found.", success=False), ephemeral=True)
             return
-        bal = self.bot.db.get_balance(interaction.guild_id, interaction.user.id)
-        if bal < row["price"]:
+        if not bought:
             await interaction.response.send_message(embed=themed_embed("Transfer Error", "Insufficient funds.", success=False), ephemeral=True)
             return
-        self.bot.db.change_balance(interaction.guild_id, interaction.user.id, -row["price"])
-        self.bot.db.add_inventory(interaction.guild_id, interaction.user.id, item_id, 1)
         await interaction.response.send_message(embed=themed_embed("Purchase Complete", f"Purchased {row['name']}"))
 
     @economy.command(name="inventory")
     async def inventory(self, interaction: discord.Interaction):
-        rows = self.bot.db.list_inventory(interaction.guild_id, interaction.user.id)
+        rows = await self.bot.db.list_inventory(interaction.guild_id, interaction.user.id)
         await interaction.response.send_message(embed=themed_embed("Inventory", "\n".join([f"{r['name']} x{r['qty']}" for r in rows]) or "Inventory empty"))
 
     @economy.command(name="admin")
@@ -17,17 +17,15 @@ class EmbedToolsCog(commands.Cog):
     embed = app_commands.Group(name="embed", description="Simple embed + Discohook tools")
 
     def _get_webhook(self, guild_id: int) -> str | None:
-        data = self.bot.guild_store.read().get(str(guild_id), {})
+        data = self.bot.guild_store.read(guild_id)
         return data.get("discohook_webhook_url")
 
     def _set_webhook(self, guild_id: int, url: str) -> None:
-        def updater(data):
-            g = data.get(str(guild_id), {})
+        def updater(g):
             g["discohook_webhook_url"] = url
-            data[str(guild_id)] = g
-            return data
+            return g
 
-        self.bot.guild_store.update(updater)
+        self.bot.guild_store.update(guild_id, updater)
 
     @embed.command(name="setwebhook", description="Set your Discohook/Discord webhook URL")
     async def setwebhook(self, interaction: discord.Interaction, url: str):
@@ -17,16 +17,15 @@ class InfractionCog(commands.Cog):
 
     @infraction.command(name="issue")
     async def issue(self, interaction: discord.Interaction, user: discord.Member):
-        self.bot.db._exec(
+        cid = await self.bot.db.execute(
             "INSERT INTO infractions (guild_id, user_id, actor_id, reason, created_at) VALUES (?, ?, ?, ?, ?)",
             (interaction.guild_id, user.id, interaction.user.id, "Configured default reason", datetime.now(timezone.utc).isoformat()),
         )
-        cid = self.bot.db._exec("SELECT last_insert_rowid()").fetchone()[0]
         await interaction.response.send_message(embed=themed_embed("Infraction Issued", f"case_id={cid}"))
 
     @infraction.command(name="view")
     async def view(self, interaction: discord.Interaction, case_id: int):
-        row = self.bot.db._exec("SELECT * FROM infractions WHERE id=? AND guild_id=?", (case_id, interaction.guild_id)).fetchone()
+        row = await self.bot.db.fetchone("SELECT * FROM infractions WHERE id=? AND guild_id=?", (case_id, interaction.guild_id))
         if not row:
             await interaction.response.send_message(embed=themed_embed("Infraction View", "Case not found.", success=False), ephemeral=True)
             return
@@ -34,7 +33,7 @@ class InfractionCog(commands.Cog):
 
     @infraction.command(name="history")
     async def history(self, interaction: discord.Interaction, user: discord.Member):
-        rows = self.bot.db._exec("SELECT id, reason, created_at FROM infractions WHERE guild_id=? AND user_id=? ORDER BY id DESC LIMIT 10", (interaction.guild_id, user.id)).fetchall()
+        rows = await self.bot.db.fetchall("SELECT id, reason, created_at FROM infractions WHERE guild_id=? AND user_id=? ORDER BY id DESC LIMIT 10", (interaction.guild_id, user.id))
         await interaction.response.send_message(embed=themed_embed("Infraction History", "\n".join([f"#{r['id']} {r['reason']}" for r in rows]) or "No infractions"))
 
 
@@ -34,21 +34,19 @@ class ModerationCog(commands.Cog):
 
     @mod.command(name="warn", description="Warn a member")
     async def warn(self, interaction: discord.Interaction, member: discord.Member, reason: str):
-        def updater(data):
-            g = data.get(str(interaction.guild_id), {})
+        def updater(g):
             user_warnings = g.get(str(member.id), [])
             user_warnings.append({"reason": reason, "by": interaction.user.id, "at": datetime.now(timezone.utc).isoformat()})
             g[str(member.id)] = user_warnings
-            data[str(interaction.guild_id)] = g
-            return data
+            return g
 
-        self.bot.warn_store.update(updater)
+        self.bot.warn_store.update(interaction.guild_id, updater)
         case_id = self._new_case(interaction.guild_id, "warn", member.id, interaction.user.id, reason)
         await send_embed(interaction, self.bot, "Member Warned", f"Target: {member.mention}\nReason: {reason}\nCase #{case_id}")
 
     @mod.command(name="warnings", description="View member warnings")
     async def warnings(self, interaction: discord.Interaction, member: discord.Member):
-        data = self.bot.warn_store.read().get(str(interaction.guild_id), {}).get(str(member.id), [])
+        data = self.bot.warn_store.read(interaction.guild_id).get(str(member.id), [])
         if not data:
             await send_embed(interaction, self.bot, "Warnings", "No warnings found.")
             return
@@ -57,27 +55,23 @@ class ModerationCog(commands.Cog):
 
     @mod.command(name="removewarn", description="Remove a warning by index")
     async def removewarn(self, interaction: discord.Interaction, member: discord.Member, index: app_commands.Range[int, 1, 100]):
-        def updater(data):
-            guild_map = data.get(str(interaction.guild_id), {})
+        def updater(guild_map):
             warns = guild_map.get(str(member.id), [])
             if 0 <= index - 1 < len(warns):
                 warns.pop(index - 1)
             guild_map[str(member.id)] = warns
-            data[str(interaction.guild_id)] = guild_map
-            return data
+            return guild_map
 
-        self.bot.warn_store.update(updater)
+        self.bot.warn_store.update(interaction.guild_id, updater)
         await send_embed(interaction, self.bot, "Warning Removed", "Warning removed if it existed.")
 
     @mod.command(name="clearwarnings", description="Clear all warnings for a member")
     async def clearwarnings(self, interaction: discord.Interaction, member: discord.Member):
-        def updater(data):
-            g = data.get(str(interaction.guild_id), {})
+        def updater(g):
             g[str(member.id)] = []
-            data[str(interaction.guild_id)] = g
-            return data
+            return g
 
-        self.bot.warn_store.update(updater)
+        self.bot.warn_store.update(interaction.guild_id, updater)
         case_id = self._new_case(interaction.guild_id, "clearwarnings", member.id, interaction.user.id, "Cleared warnings")
         await send_embed(interaction, self.bot, "Warnings Cleared", f"Target: {member.mention}\nCase #{case_id}")
 
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import io
 from datetime import datetime, timezone
 
+import discord
 from discord.ext import commands
 
+from core.profiler import ProfileBusy, capture_report
+from utils.migrate_json import SOURCES, checkpoints, run_migration
 from utils.timeparse import parse_duration
 
 
@@ -17,17 +22,17 @@ class OwnerCog(commands.Cog):
     @commands.command(name="GrantPremium")
     async def grant_premium(self, ctx: commands.Context, guild_id: int, duration: str):
         expires = parse_duration(duration).isoformat()
-        self.bot.db.set_premium(guild_id, expires)
+        await self.bot.db.set_premium(guild_id, expires)
         await ctx.send(f"Premium granted for guild {guild_id} until {expires}")
 
     @commands.command(name="RevokePremium")
     async def revoke(self, ctx: commands.Context, guild_id: int):
-        self.bot.db.revoke_premium(guild_id)
+        await self.bot.db.revoke_premium(guild_id)
         await ctx.send("Premium revoked")
 
     @commands.command(name="PremiumStatus")
     async def status(self, ctx: commands.Context, guild_id: int):
-        exp = self.bot.db.get_premium(guild_id)
+        exp = await self.bot.db.get_premium(guild_id)
         if not exp:
             await ctx.send("Premium: OFF")
             return
@@ -37,8 +42,61 @@ class OwnerCog(commands.Cog):
     @commands.command(name="OwnerStats")
     async def stats(self, ctx: commands.Context):
         total_guilds = len(self.bot.guilds)
-        premium_count = self.bot.db._exec("SELECT COUNT(*) FROM premium").fetchone()[0]
-        await ctx.send(f"Guilds={total_guilds} PremiumGuilds={premium_count}")
+        premium_count = (await self.bot.db.fetchone("SELECT COUNT(*) FROM premium"))[0]
+        cache = self.bot.db.cache_stats()
+        text = f"Guilds={total_guilds} PremiumGuilds={premium_count} ConfigCache hits={cache['hits']} misses={cache['misses']} guilds={cache['guilds']}"
+        if self.bot.loop_watchdog is not None:
+            text += "\n" + self.bot.loop_watchdog.format()
+        await ctx.send(text)
+
+    @commands.command(name="LatencyStats")
+    async def latency_stats(self, ctx: commands.Context, minutes: int = 15):
+        await ctx.send(self.bot.command_latency.format(max(1, min(minutes, 60)))[:1900])
+
+    @commands.command(name="SlowQueries")
+    async def slow_queries(self, ctx: commands.Context, limit: int = 10):
+        tracer = self.bot.db.tracer
+        rows = tracer.top(max(1, min(limit, 50)))
+        if not rows:
+            await ctx.send("No queries recorded yet.")
+            return
+        lines = [f"Slow threshold {tracer.slow_seconds * 1000:.0f}ms; slowest shapes by worst run:"]
+        for shape, stats in rows:
+            lines.append(
+                f"max={stats.max * 1000:.1f}ms avg={stats.total / stats.calls * 1000:.2f}ms calls={stats.calls} slow={stats.slow}\n"
+                f"  {shape}" + (f"\n  plan: {stats.plan}" if stats.plan else "")
+            )
+        report = "\n".join(lines)
+        if len(report) <= 1900:
+            await ctx.send(f"```\n{report}\n```")
+        else:
+            await ctx.send(file=discord.File(io.BytesIO(report.encode("utf-8")), filename="slow-queries.txt"))
+
+    @commands.command(name="Profile")
+    async def profile(self, ctx: commands.Context, seconds: int = 10, top: int = 40):
+        try:
+            summary, file = await capture_report(seconds, top, lambda s: ctx.send(f"Profiling the event loop for {s:.0f}s..."))
+        except ProfileBusy as e:
+            await ctx.send(str(e))
+            return
+        await ctx.send(summary, file=file)
+
+    @commands.command(name="MigrateJson")
+    async def migrate_json(self, ctx: commands.Context, source: str | None = None):
+        if source and source not in SOURCES:
+            await ctx.send(f"Unknown source. Use one of: {', '.join(SOURCES)}")
+            return
+        await ctx.send("JSON migration started...")
+        result = await asyncio.to_thread(run_migration, self.bot.db.path, "data", [source] if source else None)
+        await ctx.send("JSON migration finished: " + ", ".join(f"{k}={v}" for k, v in result.items()))
+
+    @commands.command(name="MigrateStatus")
+    async def migrate_status(self, ctx: commands.Context):
+        rows = await self.bot.db.run(checkpoints)
+        if not rows:
+            await ctx.send("No JSON migration has run yet.")
+            return
+        await ctx.send("\n".join(f"{r['source']}: rows={r['rows']} last={r['last_key']} done={r['completed_at'] or 'in progress'}" for r in rows))
 
 
 async def setup(bot):
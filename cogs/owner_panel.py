@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import io
 from datetime import datetime, timezone
+from pathlib import Path
 
+import discord
 from discord.ext import commands
 
 from core.premium import PREMIUM_PLAN
+from core.profiler import ProfileBusy, capture_report
+from core.serializers import SERIALIZERS
+from core.storage import ShardedJsonStore
 from core.timeparse import format_dt, parse_duration
 
 
@@ -77,6 +83,40 @@ class OwnerPanel(commands.Cog):
         lines = [f"{g.id} - {g.name} ({g.member_count})" for g in self.bot.guilds]
         await ctx.send("\n".join(lines[:40]) if lines else "No guilds")
 
+    @commands.command(name="profile")
+    async def profile(self, ctx: commands.Context, seconds: int = 10, top: int = 40):
+        try:
+            summary, file = await capture_report(seconds, top, lambda s: ctx.send(f"Profiling the event loop for {s:.0f}s..."))
+        except ProfileBusy as e:
+            await ctx.send(str(e))
+            return
+        await ctx.send(summary, file=file)
+
+    @commands.command(name="exportstore")
+    async def exportstore(self, ctx: commands.Context, name: str, guild_id: int | None = None):
+        store = self.bot.named_stores.get(name)
+        if store is None:
+            await ctx.send(f"Unknown store. Use one of: {', '.join(self.bot.named_stores)}")
+            return
+        if isinstance(store, ShardedJsonStore):
+            if guild_id is None:
+                await ctx.send(f"`{name}` is stored per guild; use `.exportstore {name} <guild_id>`")
+                return
+            data, filename = store.read(guild_id), f"{name}-{guild_id}.json"
+        else:
+            if store is self.bot.analytics_store:
+                self.bot.command_counters.flush()
+            data, filename = store.read(), f"{name}.json"
+        # Always exported as readable JSON, whatever format the store uses on disk.
+        payload = SERIALIZERS["json-pretty"].dumps(data)
+        if len(payload) > 8 * 1024 * 1024:
+            path = Path("data/exports") / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(payload)
+            await ctx.send(f"Export is {len(payload):,} bytes; saved to `{path}`")
+            return
+        await ctx.send(file=discord.File(io.BytesIO(payload), filename=filename))
+
 
 async def setup(bot):
     await bot.add_cog(OwnerPanel(bot))
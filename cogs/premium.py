@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import secrets
+import time
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
 from core.embeds import build_embed, send_embed
+from core.metrics import METRICS
 from core.premium import PREMIUM_PLAN
 from core.timeparse import format_dt, parse_duration
 
@@ -106,7 +108,10 @@ class PremiumCog(commands.Cog):
 
     @tasks.loop(minutes=1)
     async def expiry_loop(self):
+        started = time.perf_counter()
         expired = self.bot.premium.expire_due()
+        METRICS.observe("bot_premium_sweep_seconds", time.perf_counter() - started)
+        METRICS.inc("bot_premium_expired_total", len(expired))
         if expired:
             print(f"Expired premium for {expired}")
 
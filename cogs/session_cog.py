@@ -17,22 +17,33 @@ class SessionCog(commands.Cog):
 
     @session.command(name="start")
     async def start(self, interaction: discord.Interaction):
-        self.bot.db._exec(
+        started_at = datetime.now(timezone.utc).isoformat()
+        await self.bot.db.execute(
             "INSERT INTO sessions (guild_id, user_id, started_at) VALUES (?, ?, ?)",
-            (interaction.guild_id, interaction.user.id, datetime.now(timezone.utc).isoformat()),
+            (interaction.guild_id, interaction.user.id, started_at),
         )
+        rendered = await self.bot.templates.render(interaction.guild_id, "session_start", {
+            "user": interaction.user.mention,
+            "user_name": interaction.user.display_name,
+            "guild_name": interaction.guild.name if interaction.guild else "",
+            "started_at": started_at,
+        })
+        if rendered:
+            content, embeds = rendered
+            await interaction.response.send_message(content=content, embeds=embeds, ephemeral=True)
+            return
         await interaction.response.send_message(embed=themed_embed("Session Started","Your session is now active."), ephemeral=True)
 
     @session.command(name="end")
     async def end(self, interaction: discord.Interaction):
-        row = self.bot.db._exec(
+        row = await self.bot.db.fetchone(
             "SELECT id FROM sessions WHERE guild_id=? AND user_id=? AND ended_at IS NULL ORDER BY id DESC LIMIT 1",
             (interaction.guild_id, interaction.user.id),
-        ).fetchone()
+        )
         if not row:
             await interaction.response.send_message(embed=themed_embed("Session End","No active session found.", success=False), ephemeral=True)
             return
-        self.bot.db._exec("UPDATE sessions SET ended_at=? WHERE id=?", (datetime.now(timezone.utc).isoformat(), row[0]))
+        await self.bot.db.execute("UPDATE sessions SET ended_at=? WHERE id=?", (datetime.now(timezone.utc).isoformat(), row[0]))
         await interaction.response.send_message(embed=themed_embed("Session Ended","Your session has been closed."), ephemeral=True)
 
     @session.command(name="announce")
@@ -41,7 +52,7 @@ class SessionCog(commands.Cog):
 
     @session.command(name="info")
     async def info(self, interaction: discord.Interaction):
-        count = self.bot.db._exec("SELECT COUNT(*) FROM sessions WHERE guild_id=?", (interaction.guild_id,)).fetchone()[0]
+        count = (await self.bot.db.fetchone("SELECT COUNT(*) FROM sessions WHERE guild_id=?", (interaction.guild_id,)))[0]
         await interaction.response.send_message(embed=themed_embed("Session Info", f"Total sessions logged: **{count}**"))
 
 
@@ -17,29 +17,26 @@ class SessionsCog(commands.Cog):
 
     @session.command(name="start", description="Start your staff session")
     async def start(self, interaction: discord.Interaction):
-        def updater(data):
-            g = data.get(str(interaction.guild_id), {})
+        def updater(g):
             g[str(interaction.user.id)] = {
                 "active": True,
                 "started_at": datetime.now(timezone.utc).isoformat(),
                 "total_seconds": g.get(str(interaction.user.id), {}).get("total_seconds", 0),
                 "history": g.get(str(interaction.user.id), {}).get("history", []),
             }
-            data[str(interaction.guild_id)] = g
-            return data
+            return g
 
-        self.bot.session_store.update(updater)
+        self.bot.session_store.update(interaction.guild_id, updater)
         await send_embed(interaction, self.bot, "Session Started", "Your staff session is now active.")
 
     @session.command(name="end", description="End your staff session")
     async def end(self, interaction: discord.Interaction):
         now = datetime.now(timezone.utc)
 
-        def updater(data):
-            g = data.get(str(interaction.guild_id), {})
+        def updater(g):
             info = g.get(str(interaction.user.id))
             if not info or not info.get("active"):
-                return data
+                return g
             started = datetime.fromisoformat(info["started_at"])
             delta = int((now - started).total_seconds())
             info["active"] = False
@@ -48,21 +45,20 @@ class SessionsCog(commands.Cog):
             history.append({"start": info["started_at"], "end": now.isoformat(), "seconds": delta})
             info["history"] = history[-100:]
             g[str(interaction.user.id)] = info
-            data[str(interaction.guild_id)] = g
-            return data
+            return g
 
-        self.bot.session_store.update(updater)
+        self.bot.session_store.update(interaction.guild_id, updater)
         await send_embed(interaction, self.bot, "Session Ended", "Your staff session has ended.")
 
     @session.command(name="status", description="Check a member session status")
     async def status(self, interaction: discord.Interaction, member: discord.Member | None = None):
         member = member or interaction.user
-        info = self.bot.session_store.read().get(str(interaction.guild_id), {}).get(str(member.id), {})
+        info = self.bot.session_store.read(interaction.guild_id).get(str(member.id), {})
         await send_embed(interaction, self.bot, "Session Status", f"Member: {member.mention}\nActive={info.get('active', False)}\nTotal hours={info.get('total_seconds', 0)/3600:.2f}")
 
     @session.command(name="leaderboard", description="Top staff by session hours")
     async def leaderboard(self, interaction: discord.Interaction):
-        data = self.bot.session_store.read().get(str(interaction.guild_id), {})
+        data = self.bot.session_store.read(interaction.guild_id)
         ranking = sorted(data.items(), key=lambda kv: kv[1].get("total_seconds", 0), reverse=True)[:10]
         lines = []
         for uid, info in ranking:
@@ -74,7 +70,7 @@ class SessionsCog(commands.Cog):
     @session.command(name="history", description="View recent session history")
     async def history(self, interaction: discord.Interaction, member: discord.Member | None = None):
         member = member or interaction.user
-        info = self.bot.session_store.read().get(str(interaction.guild_id), {}).get(str(member.id), {})
+        info = self.bot.session_store.read(interaction.guild_id).get(str(member.id), {})
         history = info.get("history", [])[-10:]
         if not history:
             await send_embed(interaction, self.bot, "Session History", "No session history found.")
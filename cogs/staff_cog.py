@@ -17,7 +17,7 @@ class StaffCog(commands.Cog):
 
     @staff.command(name="promote")
     async def promote(self, interaction: discord.Interaction, user: discord.Member):
-        self.bot.db._exec(
+        await self.bot.db.execute(
             "INSERT INTO staff_events (guild_id, user_id, actor_id, event_type, details_json, created_at) VALUES (?, ?, ?, 'promotion', ?, ?)",
             (interaction.guild_id, user.id, interaction.user.id, "{}", datetime.now(timezone.utc).isoformat()),
         )
@@ -25,7 +25,7 @@ class StaffCog(commands.Cog):
 
     @staff.command(name="demote")
     async def demote(self, interaction: discord.Interaction, user: discord.Member):
-        self.bot.db._exec(
+        await self.bot.db.execute(
             "INSERT INTO staff_events (guild_id, user_id, actor_id, event_type, details_json, created_at) VALUES (?, ?, ?, 'demotion', ?, ?)",
             (interaction.guild_id, user.id, interaction.user.id, "{}", datetime.now(timezone.utc).isoformat()),
         )
@@ -33,10 +33,10 @@ class StaffCog(commands.Cog):
 
     @staff.command(name="history")
     async def history(self, interaction: discord.Interaction, user: discord.Member):
-        rows = self.bot.db._exec(
+        rows = await self.bot.db.fetchall(
             "SELECT event_type, created_at FROM staff_events WHERE guild_id=? AND user_id=? ORDER BY id DESC LIMIT 10",
             (interaction.guild_id, user.id),
-        ).fetchall()
+        )
         if not rows:
             await interaction.response.send_message(embed=themed_embed("Staff History", "No history found.", success=False))
             return
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from threading import Lock
+
+
+class CounterRegistry:
+    # In-memory counters over one section of a JsonStore (e.g. analytics "commands").
+    # incr() never touches the store; flush() folds the pending deltas in with a
+    # single update, from a timer and at shutdown.
+    def __init__(self, store, section: str, flush_interval: float = 30.0):
+        self.store = store
+        self.section = section
+        self.flush_interval = flush_interval
+        self.lock = Lock()
+        self._totals: Counter[str] = Counter(store.read().get(section, {}))
+        self._pending: Counter[str] = Counter()
+        self._flusher: asyncio.Task | None = None
+        self._closing = False
+        self.flushes = 0
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self._pending[key] += amount
+
+    def get(self, key: str) -> int:
+        with self.lock:
+            return self._totals[key] + self._pending[key]
+
+    def snapshot(self) -> Counter[str]:
+        with self.lock:
+            return self._totals + self._pending
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        return self.snapshot().most_common(n)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> bool:
+        with self.lock:
+            if not self._pending:
+                return False
+            deltas, self._pending = self._pending, Counter()
+            self._totals.update(deltas)
+
+        def updater(data):
+            counts = data.setdefault(self.section, {})
+            for key, amount in deltas.items():
+                counts[key] = counts.get(key, 0) + amount
+            return data
+
+        self.store.update(updater)
+        self.flushes += 1
+        return True
+
+    def start_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        self._closing = False
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush {self.section} counters: {e}")
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._closing = True
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        self.flush()
+
+
+# Bucket widths in seconds, finest first. Each table keeps counts per (bucket, key, guild).
+GRANULARITIES = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+class TimeSeries:
+    # Per-minute command counts in SQLite, rolled up into hourly and daily
+    # tables at flush time. Keys are interned into a small table and rows are
+    # WITHOUT ROWID integers, so a year of daily rows stays a few MB. A window
+    # query sums the coarsest table whose buckets fit inside the window.
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        flush_interval: float = 30.0,
+        retention: dict[str, float] | None = None,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        # Seconds each granularity is kept; None keeps it forever.
+        self.retention = {"minute": 2 * 86400, "hour": 90 * 86400, "day": None, **(retention or {})}
+        self.lock = Lock()
+        # Separate from self.lock so record() on the event loop never waits on a flush in a worker thread.
+        self.db_lock = Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS series_keys (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+        for table in GRANULARITIES:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS counts_{table} ("
+                "bucket INTEGER NOT NULL, key_id INTEGER NOT NULL, guild_id INTEGER NOT NULL, count INTEGER NOT NULL, "
+                "PRIMARY KEY (bucket, key_id, guild_id)) WITHOUT ROWID"
+            )
+        self._key_ids: dict[str, int] = dict(self.conn.execute("SELECT name, id FROM series_keys"))
+        self._pending: Counter[tuple[int, str, int]] = Counter()
+        self._flusher: asyncio.Task | None = None
+        self._closing = False
+        # Set under db_lock once the connection is closed; queries then return nothing.
+        self.closed = False
+
+    def record(self, key: str, guild_id: int | None = None, amount: int = 1, at: float | None = None) -> None:
+        minute = int((at if at is not None else time.time()) // 60) * 60
+        with self.lock:
+            self._pending[(minute, key, guild_id or 0)] += amount
+
+    def _key_id(self, name: str) -> int:
+        key_id = self._key_ids.get(name)
+        if key_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO series_keys (name) VALUES (?)", (name,))
+            key_id = self._key_ids[name] = self.conn.execute("SELECT id FROM series_keys WHERE name=?", (name,)).fetchone()[0]
+        return key_id
+
+    def flush(self) -> int:
+        with self.lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        rows: dict[str, Counter[tuple[int, int, int]]] = {table: Counter() for table in GRANULARITIES}
+        with self.db_lock:
+            if self.closed:
+                return 0
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                for (minute, key, guild_id), amount in pending.items():
+                    key_id = self._key_id(key)
+                    for table, width in GRANULARITIES.items():
+                        rows[table][(minute - minute % width, key_id, guild_id)] += amount
+                for table, counts in rows.items():
+                    self.conn.executemany(
+                        f"INSERT INTO counts_{table} (bucket, key_id, guild_id, count) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (bucket, key_id, guild_id) DO UPDATE SET count = count + excluded.count",
+                        [(*k, v) for k, v in counts.items()],
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                self._key_ids = dict(self.conn.execute("SELECT name, id FROM series_keys"))
+                with self.lock:
+                    self._pending.update(pending)
+                raise
+        return len(pending)
+
+    def prune(self, now: float | None = None) -> int:
+        now = now if now is not None else time.time()
+        removed = 0
+        with self.db_lock:
+            if self.closed:
+                return 0
+            for table, keep in self.retention.items():
+                if keep is None:
+                    continue
+                removed += self.conn.execute(f"DELETE FROM counts_{table} WHERE bucket < ?", (int(now - keep),)).rowcount
+        return removed
+
+    def _table_for(self, window: float) -> str:
+        # Coarsest granularity that still gives at least ~12 buckets in the window
+        # and has not been pruned for that span.
+        for table in ("day", "hour"):
+            keep = self.retention.get(table)
+            if window >= GRANULARITIES[table] * 12 and (keep is None or keep >= window):
+                return table
+        return "minute"
+
+    def top(self, window: float, guild_id: int | None = None, limit: int = 10, now: float | None = None) -> list[tuple[str, int]]:
+        now = now if now is not None else time.time()
+        table = self._table_for(window)
+        sql = f"SELECT k.name, SUM(c.count) AS n FROM counts_{table} c JOIN series_keys k ON k.id = c.key_id WHERE c.bucket >= ?"
+        args: list = [int(now - window) // GRANULARITIES[table] * GRANULARITIES[table]]
+        if guild_id is not None:
+            sql += " AND c.guild_id = ?"
+            args.append(guild_id)
+        sql += " GROUP BY c.key_id ORDER BY n DESC LIMIT ?"
+        args.append(limit)
+        with self.db_lock:
+            if self.closed:
+                return []
+            return self.conn.execute(sql, args).fetchall()
+
+    def series(self, key: str, window: float, guild_id: int | None = None, now: float | None = None) -> tuple[str, list[tuple[int, int]]]:
+        now = now if now is not None else time.time()
+        table = self._table_for(window)
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            return table, []
+        sql = f"SELECT bucket, SUM(count) FROM counts_{table} WHERE key_id = ? AND bucket >= ?"
+        args: list = [key_id, int(now - window) // GRANULARITIES[table] * GRANULARITIES[table]]
+        if guild_id is not None:
+            sql += " AND guild_id = ?"
+            args.append(guild_id)
+        sql += " GROUP BY bucket ORDER BY bucket"
+        with self.db_lock:
+            if self.closed:
+                return table, []
+            return table, self.conn.execute(sql, args).fetchall()
+
+    def spikes(self, window: float = 3600, baseline: float = 86400, limit: int = 10, now: float | None = None) -> list[tuple[str, int, float]]:
+        # Keys whose rate over the last `window` most exceeds their rate over the preceding `baseline`.
+        now = now if now is not None else time.time()
+        recent = dict(self.top(window, limit=1000, now=now))
+        earlier = Counter(dict(self.top(window + baseline, limit=1000, now=now)))
+        earlier.subtract(recent)
+        ratios = []
+        for key, count in recent.items():
+            expected = max(earlier[key], 0) * window / baseline
+            ratios.append((key, count, count / expected if expected else float("inf")))
+        ratios.sort(key=lambda r: (r[2], r[1]), reverse=True)
+        return ratios[:limit]
+
+    def start_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        self._closing = False
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        last_prune = 0.0
+        while not self._closing:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+                if time.monotonic() - last_prune > 3600:
+                    await asyncio.to_thread(self.prune)
+                    last_prune = time.monotonic()
+            except Exception as e:
+                print(f"Failed to flush analytics time series: {e}")
+
+    def _close_conn(self) -> None:
+        with self.db_lock:
+            self.closed = True
+            self.conn.close()
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._closing = True
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        # A cancelled to_thread flush or prune may still hold db_lock, so wait in a thread.
+        await asyncio.to_thread(self.flush)
+        await asyncio.to_thread(self._close_conn)
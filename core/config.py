@@ -11,6 +11,46 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "owner_ids": [],
     "default_embed_color": 3447003,
     "dashboard_refresh_seconds": 120,
+    "dashboard_premium_refresh_seconds": 60,
+    # Concurrent dashboard edits, and a global edit budget kept under Discord's 50 req/s limit.
+    "dashboard_workers": 8,
+    "dashboard_edits_per_second": 40,
+    # Unchanged dashboards are still re-edited this often so "Updated" never goes too stale.
+    "dashboard_max_staleness_seconds": 900,
+    # Widgets slower than this render from their last cached value.
+    "dashboard_widget_timeout_seconds": 2,
+    "storage": {
+        "write_behind": True,
+        "flush_interval_seconds": 5,
+        "flush_threshold": 50,
+        "journal": True,
+        "journal_compact_bytes": 1048576,
+        "fsync": False,
+        "shard_cache_size": 256,
+        "analytics_flush_seconds": 30,
+        # "json" (compact), "json-pretty" or "binary"; store_serializers overrides per store.
+        "serializer": "json",
+        "store_serializers": {},
+    },
+    "analytics": {
+        "path": "data/analytics.db",
+        "minute_retention_hours": 48,
+        "hour_retention_days": 90,
+        # 0 keeps daily totals forever.
+        "day_retention_days": 0,
+    },
+    # Event-loop watchdog: logs the loop thread's stack when a callback blocks past the threshold.
+    "loop_watchdog": {
+        "enabled": True,
+        "interval_ms": 100,
+        "block_threshold_ms": 250,
+    },
+    # Prometheus text exporter; keep it on localhost and scrape through a local agent.
+    "metrics": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "port": 9108,
+    },
     "branding": {
         "author_name": "Blox Studios",
         "footer_text": "Blox Studios Bot",
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import json
+import random
+import time
+from collections import Counter, deque
+from typing import Awaitable, Callable
+
+import discord
+
+from core.metrics import METRICS
+
+# Discord allows roughly 5 message edits per 5 seconds per channel.
+CHANNEL_EDIT_RATE = 1.0
+CHANNEL_EDIT_BURST = 5
+
+
+def embed_digest(embed: discord.Embed) -> str:
+    data = embed.to_dict()
+    data.pop("timestamp", None)
+    return hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+class TokenBucket:
+    # Reservation-style bucket: acquire() takes a token now and sleeps off any debt,
+    # so concurrent callers queue up in order without a lock (single event loop).
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class DashboardRefresher:
+    # Refreshes linked dashboard messages on a per-guild schedule. A min-heap of
+    # (due, generation, guild_id) feeds a bounded pool of workers; reschedule()
+    # bumps the generation so older heap entries are dropped when popped.
+    # Links are indexed once from the guild store and kept current by
+    # link()/unlink(), and edits go through a partial message, so a refresh
+    # costs one API call. render(guild) returns the embed and a digest of its
+    # content without the timestamp; unchanged dashboards are skipped until
+    # max_staleness passes.
+    def __init__(
+        self,
+        bot,
+        store,
+        render: Callable[[discord.Guild], Awaitable[tuple[discord.Embed, str | None]]],
+        interval: Callable[[int], float] | None = None,
+        *,
+        workers: int = 8,
+        edits_per_second: float = 40.0,
+        max_staleness: float = 900.0,
+        timings: int = 512,
+    ):
+        self.bot = bot
+        self.store = store
+        self.render = render
+        self.interval = interval or (lambda guild_id: 120.0)
+        self.workers = workers
+        self.max_staleness = max_staleness
+        self.links: dict[int, tuple[int, int]] = {}
+        self.state: dict[int, tuple[str, float]] = {}
+        self._heap: list[tuple[float, int, int]] = []
+        self._generation: dict[int, int] = {}
+        self._queued: set[int] = set()
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+        self._wake: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._channels: dict[int, TokenBucket] = {}
+        self._global = TokenBucket(edits_per_second, max(1, int(edits_per_second)))
+        self._timings: deque[float] = deque(maxlen=timings)
+        self._refresh_timings: deque[float] = deque(maxlen=timings)
+        self._lags: deque[float] = deque(maxlen=timings)
+        self.dispatched = 0
+        self.edits = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.errors: Counter[str] = Counter()
+
+    def load_links(self) -> None:
+        self.links.clear()
+        self.state.clear()
+        for guild_id in self.store.guild_ids():
+            conf = self.store.read(guild_id)
+            if conf.get("dashboard_message_id") and conf.get("dashboard_channel_id"):
+                self.link(int(guild_id), conf["dashboard_channel_id"], conf["dashboard_message_id"])
+                if conf.get("dashboard_hash"):
+                    self.state[int(guild_id)] = (conf["dashboard_hash"], conf.get("dashboard_refreshed_at", 0.0))
+
+    def link(self, guild_id: int, channel_id: int, message_id: int, digest: str | None = None) -> None:
+        self.links[guild_id] = (int(channel_id), int(message_id))
+        self.state.pop(guild_id, None)
+        if digest is not None:
+            # Just posted: the first refresh is a full interval away.
+            self._remember(guild_id, digest)
+            self.schedule(guild_id, self.interval(guild_id))
+        else:
+            self.schedule(guild_id)
+
+    def unlink(self, guild_id: int) -> None:
+        self.links.pop(guild_id, None)
+        self.state.pop(guild_id, None)
+        # Orphan any queued heap entry; the counter keeps increasing so a later link() cannot revive it.
+        self._generation[guild_id] = self._generation.get(guild_id, 0) + 1
+
+    def _remember(self, guild_id: int, digest: str) -> None:
+        refreshed_at = time.time()
+        self.state[guild_id] = (digest, refreshed_at)
+
+        def updater(gc):
+            gc["dashboard_hash"] = digest
+            gc["dashboard_refreshed_at"] = refreshed_at
+            return gc
+
+        self.store.update(guild_id, updater)
+
+    # ----- scheduling -----
+    def schedule(self, guild_id: int, delay: float | None = None) -> None:
+        # No delay means a random offset within one interval, which spreads
+        # guilds loaded together evenly instead of refreshing them in a burst.
+        if guild_id not in self.links:
+            return
+        generation = self._generation.get(guild_id, 0) + 1
+        self._generation[guild_id] = generation
+        if delay is None:
+            delay = random.uniform(0, self.interval(guild_id))
+        heapq.heappush(self._heap, (time.monotonic() + delay, generation, guild_id))
+        if self._wake is not None:
+            self._wake.set()
+
+    def reschedule(self, guild_id: int) -> None:
+        # Settings changed: refresh shortly, then continue at the guild's current interval.
+        self.schedule(guild_id, 1.0)
+
+    def next_due(self, guild_id: int) -> float | None:
+        generation = self._generation.get(guild_id)
+        due = [d for d, g, gid in self._heap if gid == guild_id and g == generation]
+        return due[0] - time.monotonic() if due else None
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due, generation, guild_id = heapq.heappop(self._heap)
+                if self._generation.get(guild_id) != generation or guild_id not in self.links:
+                    continue
+                self._lags.append(now - due)
+                if guild_id not in self._queued:
+                    self._queued.add(guild_id)
+                    self._queue.put_nowait(guild_id)
+                    self.dispatched += 1
+                interval = self.interval(guild_id)
+                # Keep the guild's phase, unless it fell a whole interval behind.
+                heapq.heappush(self._heap, (max(due + interval, now + interval / 2), generation, guild_id))
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def stop(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    async def _worker(self) -> None:
+        while True:
+            guild_id = await self._queue.get()
+            started = time.perf_counter()
+            try:
+                await self.refresh(guild_id)
+            except Exception as e:
+                self.errors[type(e).__name__] += 1
+                print(f"Dashboard refresh failed for guild {guild_id}: {e}")
+            finally:
+                self._queued.discard(guild_id)
+                elapsed = time.perf_counter() - started
+                self._refresh_timings.append(elapsed)
+                METRICS.observe("bot_dashboard_refresh_seconds", elapsed)
+                self._queue.task_done()
+
+    async def refresh(self, guild_id: int, force: bool = False) -> str:
+        # Returns "ok", "unchanged", "unlinked", "no_guild" or an error name; raises only on unexpected errors.
+        target = self.links.get(guild_id)
+        if target is None:
+            return "unlinked"
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            self.skipped += 1
+            return "no_guild"
+        embed, digest = await self.render(guild)
+        last = self.state.get(guild_id)
+        if not force and digest is not None and last is not None and last[0] == digest and time.time() - last[1] < self.max_staleness:
+            self.unchanged += 1
+            return "unchanged"
+        channel_id, message_id = target
+        bucket = self._channels.get(channel_id)
+        if bucket is None:
+            bucket = self._channels[channel_id] = TokenBucket(CHANNEL_EDIT_RATE, CHANNEL_EDIT_BURST)
+        await bucket.acquire()
+        await self._global.acquire()
+        message = self.bot.get_partial_messageable(channel_id, guild_id=guild_id).get_partial_message(message_id)
+        started = time.perf_counter()
+        try:
+            await message.edit(embed=embed)
+        except discord.NotFound:
+            # Deleted message or channel: stop editing it until the dashboard is posted again.
+            self.unlink(guild_id)
+            self.errors["not_found"] += 1
+            return "not_found"
+        except discord.Forbidden:
+            self.errors["forbidden"] += 1
+            return "forbidden"
+        except discord.HTTPException as e:
+            self.errors[f"http_{e.status}"] += 1
+            return f"http_{e.status}"
+        self._timings.append(time.perf_counter() - started)
+        self.edits += 1
+        if digest is not None and guild_id in self.links:
+            self._remember(guild_id, digest)
+        return "ok"
+
+    def collect(self):
+        # Metrics collector: samples read at scrape time.
+        yield "bot_dashboard_edits_total", (), self.edits
+        yield "bot_dashboard_unchanged_total", (), self.unchanged
+        yield "bot_dashboard_backlog", (), self.backlog
+        yield "bot_dashboard_linked", (), len(self.links)
+        for kind, count in self.errors.items():
+            yield "bot_dashboard_errors_total", (("kind", kind),), count
+
+    def stats(self) -> dict[str, float | int | dict[str, int]]:
+        def pct(samples: deque[float], q: float) -> float:
+            ordered = sorted(samples)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000 if ordered else 0.0
+
+        return {
+            "linked": len(self.links),
+            "workers": len([t for t in self._tasks if not t.done()]),
+            "backlog": self.backlog,
+            "dispatched": self.dispatched,
+            "edits": self.edits,
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+            "refresh_p50_ms": pct(self._refresh_timings, 0.5),
+            "refresh_p95_ms": pct(self._refresh_timings, 0.95),
+            "edit_p50_ms": pct(self._timings, 0.5),
+            "edit_p95_ms": pct(self._timings, 0.95),
+            "lag_p95_ms": pct(self._lags, 0.95),
+            "errors": dict(self.errors),
+        }
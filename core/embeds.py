@@ -1,51 +1,130 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 import discord
 
+from core.templates import compile_template
+
+# Guild store keys that feed build_embed; writers of these must invalidate the branding cache.
+BRANDING_KEYS = ("embed_branding", "embed_style", "embed_templates")
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
 
 def apply_variables(text: str, guild: discord.Guild, user: discord.abc.User, extra: dict[str, str] | None = None) -> str:
+    template = compile_template(text)
+    if not template.names:
+        return text
+    # Built-ins are lazy: they are only computed if the template uses them.
     values = {
-        "guild_name": guild.name,
-        "member_count": str(guild.member_count or 0),
-        "user": user.mention,
-        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+        "guild_name": lambda: guild.name,
+        "member_count": lambda: guild.member_count or 0,
+        "user": lambda: user.mention,
+        "timestamp": _timestamp,
     }
     if extra:
         values.update(extra)
+    return template.render(values)
 
-    for key, value in values.items():
-        text = text.replace(f"{{{key}}}", value)
-    return text
 
+@dataclass(frozen=True)
+class Branding:
+    color: int
+    author_name: str = ""
+    footer_text: str = ""
+    thumbnail_url: str = ""
+    banner_url: str = ""
+    title_prefix: str = ""
+    title_suffix: str = ""
+    description_prefix: str = ""
+    description_suffix: str = ""
 
-def build_embed(bot, guild: discord.Guild, title: str, description: str) -> discord.Embed:
+
+def resolve_branding(bot, guild_id: int | None) -> Branding:
     color = bot.config.get("default_embed_color", 3447003)
-    brand = bot.config.get("branding", {}).copy()
-
-    if guild and hasattr(bot, "guild_store"):
-        gdata = bot.guild_store.read().get(str(guild.id), {})
-        gbrand = gdata.get("embed_branding", {})
-        gstyle = gdata.get("embed_style", {})
-        gtmpl = gdata.get("embed_templates", {})
-        color = gstyle.get("color", color)
-        brand["author_name"] = gbrand.get("author", brand.get("author_name", ""))
-        brand["footer_text"] = gbrand.get("footer", brand.get("footer_text", ""))
-        brand["thumbnail_url"] = gbrand.get("thumbnail_url", brand.get("thumbnail_url", ""))
-        brand["banner_url"] = gbrand.get("banner_url", brand.get("banner_url", ""))
-        title = f"{gtmpl.get('title_prefix', '')}{title}{gtmpl.get('title_suffix', '')}"
-        description = f"{gtmpl.get('description_prefix', '')}{description}{gtmpl.get('description_suffix', '')}"
-
-    embed = discord.Embed(title=title[:256], description=description[:4000], color=color, timestamp=datetime.now(timezone.utc))
-    if brand.get("author_name"):
-        embed.set_author(name=brand["author_name"])
-    if brand.get("footer_text"):
-        embed.set_footer(text=brand["footer_text"])
-    if brand.get("thumbnail_url"):
-        embed.set_thumbnail(url=brand["thumbnail_url"])
-    if brand.get("banner_url"):
-        embed.set_image(url=brand["banner_url"])
+    brand = bot.config.get("branding", {})
+    if guild_id is None or not hasattr(bot, "guild_store"):
+        return Branding(
+            color=color,
+            author_name=brand.get("author_name", ""),
+            footer_text=brand.get("footer_text", ""),
+            thumbnail_url=brand.get("thumbnail_url", ""),
+            banner_url=brand.get("banner_url", ""),
+        )
+    gdata = bot.guild_store.read(guild_id)
+    gbrand = gdata.get("embed_branding", {})
+    gstyle = gdata.get("embed_style", {})
+    gtmpl = gdata.get("embed_templates", {})
+    return Branding(
+        color=gstyle.get("color", color),
+        author_name=gbrand.get("author", brand.get("author_name", "")),
+        footer_text=gbrand.get("footer", brand.get("footer_text", "")),
+        thumbnail_url=gbrand.get("thumbnail_url", brand.get("thumbnail_url", "")),
+        banner_url=gbrand.get("banner_url", brand.get("banner_url", "")),
+        title_prefix=gtmpl.get("title_prefix", ""),
+        title_suffix=gtmpl.get("title_suffix", ""),
+        description_prefix=gtmpl.get("description_prefix", ""),
+        description_suffix=gtmpl.get("description_suffix", ""),
+    )
+
+
+class BrandingCache:
+    # Resolved branding per guild, so building an embed touches no store.
+    def __init__(self, bot, max_size: int = 1024):
+        self.bot = bot
+        self.max_size = max_size
+        self._entries: OrderedDict[int | None, Branding] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, guild_id: int | None) -> Branding:
+        branding = self._entries.get(guild_id)
+        if branding is not None:
+            self.hits += 1
+            self._entries.move_to_end(guild_id)
+            return branding
+        self.misses += 1
+        branding = resolve_branding(self.bot, guild_id)
+        self._entries[guild_id] = branding
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return branding
+
+    def invalidate(self, guild_id: int | None = None) -> None:
+        # No guild_id drops everything, e.g. after the global branding config changes.
+        if guild_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(guild_id, None)
+
+
+def invalidate_branding(bot, guild_id: int | None = None) -> None:
+    cache = getattr(bot, "branding_cache", None)
+    if cache is not None:
+        cache.invalidate(guild_id)
+
+
+def build_embed(bot, guild: discord.Guild, title: str, description: str) -> discord.Embed:
+    guild_id = guild.id if guild else None
+    cache = getattr(bot, "branding_cache", None)
+    brand = cache.get(guild_id) if cache is not None else resolve_branding(bot, guild_id)
+    title = f"{brand.title_prefix}{title}{brand.title_suffix}"
+    description = f"{brand.description_prefix}{description}{brand.description_suffix}"
+
+    embed = discord.Embed(title=title[:256], description=description[:4000], color=brand.color, timestamp=datetime.now(timezone.utc))
+    if brand.author_name:
+        embed.set_author(name=brand.author_name)
+    if brand.footer_text:
+        embed.set_footer(text=brand.footer_text)
+    if brand.thumbnail_url:
+        embed.set_thumbnail(url=brand.thumbnail_url)
+    if brand.banner_url:
+        embed.set_image(url=brand.banner_url)
     return embed
 
 
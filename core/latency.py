@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import bisect
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any
+
+import discord
+from discord import app_commands
+from discord.webhook.async_ import async_context
+
+# Upper bounds in ms; the last bucket catches everything slower.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+PARTS = ("total", "handler", "storage", "discord")
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum += ms
+
+    def merge(self, other: Histogram) -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> float:
+        # Linear interpolation inside the bucket holding the q-th observation.
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS_MS[i - 1] if i else 0.0
+                high = BUCKETS_MS[i] if BUCKETS_MS[i] != float("inf") else low * 2
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return BUCKETS_MS[-2]
+
+
+class Span:
+    # Time spent in storage and Discord calls while one command runs.
+    __slots__ = ("key", "storage", "discord", "active")
+
+    def __init__(self):
+        self.key: str | None = None
+        self.storage = 0.0
+        self.discord = 0.0
+        self.active: set[str] = set()
+
+
+_current: ContextVar[Span | None] = ContextVar("latency_span", default=None)
+
+
+class track:
+    # Adds the block's wall time to the current command's span under `kind`
+    # ("storage" or "discord"). Nested blocks of the same kind count once, and
+    # outside a command this is a contextvar lookup and nothing else.
+    __slots__ = ("kind", "span", "started")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+
+    def __enter__(self) -> track:
+        span = _current.get()
+        if span is not None and self.kind not in span.active:
+            span.active.add(self.kind)
+            self.span = span
+            self.started = time.perf_counter()
+        else:
+            self.span = None
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        span = self.span
+        if span is not None:
+            setattr(span, self.kind, getattr(span, self.kind) + time.perf_counter() - self.started)
+            span.active.discard(self.kind)
+
+
+def track_future(fut, kind: str = "storage") -> None:
+    # For work handed to another thread: counts submit-to-result time.
+    span = _current.get()
+    if span is None:
+        return
+    started = time.perf_counter()
+
+    def done(_):
+        setattr(span, kind, getattr(span, kind) + time.perf_counter() - started)
+
+    fut.add_done_callback(done)
+
+
+class measure:
+    # Opens a span for one command; set span.key inside the block to record it.
+    __slots__ = ("registry", "span", "token", "started")
+
+    def __init__(self, registry: LatencyRegistry, key: str | None = None):
+        self.registry = registry
+        self.span = Span()
+        self.span.key = key
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        self.started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, *exc: Any) -> None:
+        total = time.perf_counter() - self.started
+        _current.reset(self.token)
+        if self.span.key:
+            self.registry.record(self.span.key, total, self.span.storage, self.span.discord)
+
+
+class LatencyRegistry:
+    # Per-command histograms in one-minute slots; the last `minutes` are kept,
+    # so a window query reflects recent behaviour rather than lifetime averages.
+    def __init__(self, minutes: int = 60):
+        self._slots: deque[tuple[int, dict[str, dict[str, Histogram]]]] = deque(maxlen=minutes)
+
+    def _slot(self) -> dict[str, dict[str, Histogram]]:
+        minute = int(time.time() // 60)
+        if not self._slots or self._slots[-1][0] != minute:
+            self._slots.append((minute, {}))
+        return self._slots[-1][1]
+
+    def record(self, key: str, total: float, storage: float = 0.0, discord_: float = 0.0) -> None:
+        hists = self._slot().get(key)
+        if hists is None:
+            hists = self._slot()[key] = {part: Histogram() for part in PARTS}
+        hists["total"].observe(total * 1000)
+        hists["handler"].observe(max(0.0, total - storage - discord_) * 1000)
+        hists["storage"].observe(storage * 1000)
+        hists["discord"].observe(discord_ * 1000)
+
+    def window(self, minutes: int = 15) -> dict[str, dict[str, Histogram]]:
+        since = int(time.time() // 60) - minutes
+        merged: dict[str, dict[str, Histogram]] = {}
+        for minute, slot in self._slots:
+            if minute <= since:
+                continue
+            for key, hists in slot.items():
+                target = merged.setdefault(key, {part: Histogram() for part in PARTS})
+                for part, hist in hists.items():
+                    target[part].merge(hist)
+        return merged
+
+    def summary(self, minutes: int = 15, limit: int = 15) -> list[tuple[str, int, float, float, float, dict[str, float]]]:
+        # (key, calls, p50, p95, p99, p95 per part), slowest p99 first.
+        rows = []
+        for key, hists in self.window(minutes).items():
+            total = hists["total"]
+            parts = {part: hists[part].quantile(0.95) for part in PARTS[1:]}
+            rows.append((key, total.count, total.quantile(0.5), total.quantile(0.95), total.quantile(0.99), parts))
+        rows.sort(key=lambda r: r[4], reverse=True)
+        return rows[:limit]
+
+    def format(self, minutes: int = 15, limit: int = 15) -> str:
+        lines = [
+            f"`{key}` n={n} p50={p50:.0f} p95={p95:.0f} p99={p99:.0f}ms "
+            f"(p95 handler {parts['handler']:.0f} / storage {parts['storage']:.0f} / discord {parts['discord']:.0f})"
+            for key, n, p50, p95, p99, parts in self.summary(minutes, limit)
+        ]
+        return "\n".join(lines) or f"No commands in the last {minutes} minutes."
+
+
+class TimedCommandTree(app_commands.CommandTree):
+    # Times every app command invocation into client.command_latency using the
+    # public hooks: the span opens in interaction_check and closes on the
+    # app_command_completion event or in on_error. Each interaction runs in its
+    # own task, so the span set here is only seen by that command.
+    def __init__(self, client: discord.Client, **kwargs: Any):
+        super().__init__(client, **kwargs)
+        client.add_listener(self._on_completion, "on_app_command_completion")
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is discord.InteractionType.application_command:
+            span = Span()
+            _current.set(span)
+            interaction.extras["latency_span"] = (span, time.perf_counter())
+        return True
+
+    def _finish(self, interaction: discord.Interaction) -> None:
+        entry = interaction.extras.pop("latency_span", None)
+        if entry is None or interaction.command is None:
+            return
+        span, started = entry
+        self.client.command_latency.record(
+            f"slash:{interaction.command.qualified_name}", time.perf_counter() - started, span.storage, span.discord
+        )
+
+    async def _on_completion(self, interaction: discord.Interaction, command: Any) -> None:
+        self._finish(interaction)
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        self._finish(interaction)
+        await super().on_error(interaction, error)
+
+
+def _timed(request):
+    async def timed_request(*args: Any, **kwargs: Any) -> Any:
+        with track("discord"):
+            return await request(*args, **kwargs)
+
+    timed_request.timed = True
+    return timed_request
+
+
+def instrument_http(client: discord.Client) -> None:
+    # REST calls go through HTTPClient.request; interaction responses and
+    # followups go through the shared webhook adapter. Both count as Discord time.
+    if not getattr(client.http.request, "timed", False):
+        client.http.request = _timed(client.http.request)
+    adapter = async_context.get()
+    if not getattr(adapter.request, "timed", False):
+        adapter.request = _timed(adapter.request)
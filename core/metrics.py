@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Callable, Iterable
+
+from aiohttp import web
+
+Labels = tuple[tuple[str, str], ...]
+# (name, labels, value) samples produced at scrape time, e.g. gauges read off live objects.
+Collector = Callable[[], Iterable[tuple[str, Labels, float]]]
+
+DESCRIPTIONS = {
+    "bot_store_operation_seconds": ("summary", "JsonStore read/write/update calls and time spent."),
+    "bot_db_query_seconds": ("summary", "SQLite statements run by Database._exec, by statement kind."),
+    "bot_dashboard_refresh_seconds": ("summary", "Time to render and edit one dashboard."),
+    "bot_dashboard_edits_total": ("counter", "Dashboard messages edited."),
+    "bot_dashboard_unchanged_total": ("counter", "Dashboard refreshes skipped because content was unchanged."),
+    "bot_dashboard_errors_total": ("counter", "Dashboard refresh errors by kind."),
+    "bot_dashboard_backlog": ("gauge", "Dashboards waiting for a refresh worker."),
+    "bot_dashboard_linked": ("gauge", "Linked dashboard messages."),
+    "bot_premium_sweep_seconds": ("summary", "Premium expiry sweeps and time spent."),
+    "bot_premium_expired_total": ("counter", "Guilds whose premium expired in a sweep."),
+    "bot_gateway_latency_seconds": ("gauge", "Discord gateway heartbeat latency."),
+    "bot_guilds": ("gauge", "Guilds the bot is in."),
+    "bot_event_loop_lag_seconds": ("summary", "Delay between when a loop callback was due and when it ran."),
+    "bot_event_loop_stalls_total": ("counter", "Times the event loop was blocked past the watchdog threshold."),
+}
+
+
+class Metrics:
+    # Process-wide counters and summaries (count + sum), safe to update from
+    # worker threads. render() produces Prometheus text exposition format.
+    def __init__(self):
+        self.lock = Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._summaries: dict[tuple[str, Labels], list[float]] = {}
+        self._collectors: list[Collector] = []
+
+    def inc(self, name: str, amount: float = 1, labels: Labels = ()) -> None:
+        key = (name, labels)
+        with self.lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, labels: Labels = ()) -> None:
+        key = (name, labels)
+        with self.lock:
+            entry = self._summaries.get(key)
+            if entry is None:
+                self._summaries[key] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Collector) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        samples: dict[str, list[tuple[str, Labels, float]]] = {}
+        with self.lock:
+            for (name, labels), value in self._counters.items():
+                samples.setdefault(name, []).append((name, labels, value))
+            for (name, labels), (count, total) in self._summaries.items():
+                samples.setdefault(name, []).append((f"{name}_count", labels, count))
+                samples[name].append((f"{name}_sum", labels, total))
+        for collector in list(self._collectors):
+            try:
+                for name, labels, value in collector():
+                    samples.setdefault(name, []).append((name, labels, value))
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        lines = []
+        for name in sorted(samples):
+            kind, text = DESCRIPTIONS.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample, labels, value in samples[name]:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{sample}{{{label_text}}} {value}" if label_text else f"{sample} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics()
+
+
+class MetricsServer:
+    # Serves METRICS at http://host:port/metrics from the bot's own event loop.
+    # Rendering only formats in-memory numbers, so a scrape never blocks on I/O.
+    # Event-loop lag is fed in by core.watchdog.LoopWatchdog.
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108, metrics: Metrics = METRICS):
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self._runner: web.AppRunner | None = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.render(), content_type="text/plain", charset="utf-8", headers={"X-Content-Type-Options": "nosniff"})
+
+    async def start(self) -> None:
+        if self.host not in ("127.0.0.1", "localhost", "::1"):
+            print(f"Warning: metrics exporter is listening on {self.host}, not localhost")
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"Metrics exporter listening on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def bot_collector(bot) -> Collector:
+    def collect():
+        if bot.latency == bot.latency:  # NaN before the first heartbeat
+            yield "bot_gateway_latency_seconds", (), bot.latency
+        yield "bot_guilds", (), len(bot.guilds)
+
+    return collect
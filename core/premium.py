@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable
 
 from core.storage import JsonStore
 
@@ -9,8 +9,14 @@ PREMIUM_PLAN = "Premium"
 
 
 class PremiumManager:
-    def __init__(self):
-        self.store = JsonStore("data/premium.json", {"guilds": {}, "licenses": {}, "controllers": {}})
+    def __init__(self, **store_options: Any):
+        self.store = JsonStore("data/premium.json", {"guilds": {}, "licenses": {}, "controllers": {}}, **store_options)
+        # Called with a guild id whenever that guild's premium status changes.
+        self.listeners: list[Callable[[int], None]] = []
+
+    def _notify(self, guild_id: int) -> None:
+        for listener in self.listeners:
+            listener(guild_id)
 
     def get(self, guild_id: int) -> dict[str, Any]:
         data = self.store.read()
@@ -32,6 +38,7 @@ class PremiumManager:
             return data
 
         self.store.update(updater)
+        self._notify(guild_id)
 
     def remove_premium(self, guild_id: int) -> None:
         def updater(data):
@@ -39,6 +46,7 @@ class PremiumManager:
             return data
 
         self.store.update(updater)
+        self._notify(guild_id)
 
     def is_active(self, guild_id: int) -> bool:
         p = self.get(guild_id)
@@ -60,6 +68,8 @@ class PremiumManager:
                     expired.append(int(gid))
         if expired:
             self.store.write(data)
+        for guild_id in expired:
+            self._notify(guild_id)
         return expired
 
     def create_license(self, key: str, duration: str, uses: int = 1) -> None:
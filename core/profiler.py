@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import pstats
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import discord
+
+PROFILE_DIR = Path("data/profiles")
+MAX_SECONDS = 60
+KEEP_PROFILES = 20
+
+# cProfile hooks one thread at a time and slows it while enabled, so only one
+# capture may run and its length is capped.
+_lock = asyncio.Lock()
+
+
+class ProfileBusy(RuntimeError):
+    pass
+
+
+def _save(profile: cProfile.Profile, top: int) -> tuple[Path, str]:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / f"profile-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.prof"
+    profile.dump_stats(path)
+    for old in sorted(PROFILE_DIR.glob("profile-*.prof"))[:-KEEP_PROFILES]:
+        old.unlink(missing_ok=True)
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.sort_stats("cumulative").print_stats(top)
+    stats.sort_stats("tottime").print_stats(top)
+    return path, out.getvalue()
+
+
+def clamp(seconds: float) -> float:
+    return max(1.0, min(float(seconds), MAX_SECONDS))
+
+
+async def capture(
+    seconds: float, top: int = 40, on_start: Callable[[float], Awaitable[object]] | None = None
+) -> tuple[Path, str, float]:
+    # Profiles the event loop thread (where all bot code runs) for `seconds`.
+    # Returns the raw .prof path, a text report and the seconds captured.
+    # on_start(seconds) runs once the capture holds the lock, so a refused
+    # capture never announces itself.
+    if _lock.locked():
+        raise ProfileBusy("A profile capture is already running.")
+    seconds = clamp(seconds)
+    async with _lock:
+        if on_start is not None:
+            await on_start(seconds)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+        path, report = await asyncio.to_thread(_save, profile, top)
+    return path, report, seconds
+
+
+async def capture_report(
+    seconds: float, top: int = 40, on_start: Callable[[float], Awaitable[object]] | None = None
+) -> tuple[str, discord.File]:
+    # capture() packaged for an owner command: summary line and the report as an attachment.
+    path, report, took = await capture(seconds, top, on_start)
+    file = discord.File(io.BytesIO(report.encode("utf-8")), filename=f"{path.stem}.txt")
+    return f"Captured {took:.0f}s; raw profile saved to `{path}`", file
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Iterator
+
+# Binary store layout ("BXJ1"), all integers little-endian:
+#   magic "BXJ1" | u8 kind
+#   kind 0 (raw):    u32 len | compact JSON
+#   kind 1 (object): u32 count | entries
+#     entry: u32 key_len | key utf-8 | u8 tag
+#       tag 0 (value):  u32 len | compact JSON
+#       tag 1 (object): u32 count | count x (u32 key_len | key | u32 len | compact JSON)
+#   u32 CRC32 of everything before it
+# Objects are split two levels deep (e.g. "items" -> case_id), the same
+# granularity as the JsonStore journal, so a reader can stream one record
+# at a time and a loader can decode each section in a single json pass.
+MAGIC = b"BXJ1"
+_U32 = struct.Struct("<I")
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+class SerializerError(ValueError):
+    pass
+
+
+class Serializer(ABC):
+    name = ""
+
+    @abstractmethod
+    def dumps(self, data: Any) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, raw: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    def __init__(self, name: str, indent: int | None = None):
+        self.name = name
+        self.indent = indent
+
+    def dumps(self, data: Any) -> bytes:
+        if self.indent is None:
+            return _encode(data).encode("utf-8")
+        return json.dumps(data, indent=self.indent).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+
+class BinarySerializer(Serializer):
+    name = "binary"
+
+    def dumps(self, data: Any) -> bytes:
+        pack = _U32.pack
+        parts = [MAGIC]
+        if not isinstance(data, dict):
+            blob = _encode(data).encode("utf-8")
+            parts += [b"\x00", pack(len(blob)), blob]
+        else:
+            parts += [b"\x01", pack(len(data))]
+            for key, value in data.items():
+                key_blob = str(key).encode("utf-8")
+                parts += [pack(len(key_blob)), key_blob]
+                if isinstance(value, dict):
+                    parts += [b"\x01", pack(len(value))]
+                    for sub, sub_value in value.items():
+                        sub_blob = str(sub).encode("utf-8")
+                        blob = _encode(sub_value).encode("utf-8")
+                        parts += [pack(len(sub_blob)), sub_blob, pack(len(blob)), blob]
+                else:
+                    blob = _encode(value).encode("utf-8")
+                    parts += [b"\x00", pack(len(blob)), blob]
+        out = b"".join(parts)
+        return out + pack(zlib.crc32(out))
+
+    def loads(self, raw: bytes) -> Any:
+        if raw[:4] != MAGIC:
+            raise SerializerError("Not a BXJ1 file")
+        body, (crc,) = raw[:-4], _U32.unpack_from(raw, len(raw) - 4)
+        if zlib.crc32(body) != crc:
+            raise SerializerError("BXJ1 checksum mismatch")
+        view = memoryview(body)
+        pos = 4
+        kind = view[pos]
+        pos += 1
+        if kind == 0:
+            blob, pos = _get_blob(view, pos)
+            return json.loads(blob)
+        (count,), pos = _U32.unpack_from(view, pos), pos + 4
+        keys: list[str] = []
+        values: list[Any] = []
+        scalars: list[bytes] = []
+        for _ in range(count):
+            key, pos = _get_blob(view, pos)
+            tag = view[pos]
+            pos += 1
+            keys.append(key.decode("utf-8"))
+            if tag == 0:
+                blob, pos = _get_blob(view, pos)
+                values.append(len(scalars))
+                scalars.append(blob)
+                continue
+            (n,), pos = _U32.unpack_from(view, pos), pos + 4
+            sub_keys, blobs = [], []
+            for _ in range(n):
+                sub, pos = _get_blob(view, pos)
+                blob, pos = _get_blob(view, pos)
+                sub_keys.append(sub.decode("utf-8"))
+                blobs.append(blob)
+            # One json pass per section instead of one per record.
+            values.append(dict(zip(sub_keys, _decode_many(blobs))))
+        decoded = _decode_many(scalars)
+        return {k: decoded[v] if isinstance(v, int) else v for k, v in zip(keys, values)}
+
+
+def _get_blob(view: memoryview, pos: int) -> tuple[bytes, int]:
+    (n,) = _U32.unpack_from(view, pos)
+    end = pos + 4 + n
+    if end > len(view):
+        raise SerializerError("Truncated BXJ1 file")
+    return bytes(view[pos + 4:end]), end
+
+
+def _decode_many(blobs: list[bytes]) -> list[Any]:
+    if not blobs:
+        return []
+    return json.loads(b"[" + b",".join(blobs) + b"]")
+
+
+SERIALIZERS: dict[str, Serializer] = {
+    "json": JsonSerializer("json"),
+    "json-pretty": JsonSerializer("json-pretty", indent=2),
+    "binary": BinarySerializer(),
+}
+
+
+def get_serializer(name: str | Serializer) -> Serializer:
+    if isinstance(name, Serializer):
+        return name
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise SerializerError(f"Unknown serializer {name!r}; use one of {', '.join(SERIALIZERS)}") from None
+
+
+def detect(raw: bytes) -> Serializer:
+    # Reads accept any format, so switching a store's serializer needs no conversion step.
+    return SERIALIZERS["binary"] if raw[:4] == MAGIC else SERIALIZERS["json"]
+
+
+def loads(raw: bytes) -> Any:
+    return detect(raw).loads(raw)
+
+
+def is_binary(fp: BinaryIO) -> bool:
+    head = fp.read(4)
+    fp.seek(0)
+    return head == MAGIC
+
+
+def iter_binary_items(fp: BinaryIO, keys: tuple[str, ...] = ()) -> Iterator[tuple[str, Any]]:
+    # Streams (key, value) pairs of the object at `keys` (at most two levels)
+    # from a BXJ1 file without loading the rest; the CRC is checked at the end.
+    crc = 0
+
+    def take(n: int) -> bytes:
+        nonlocal crc
+        chunk = fp.read(n)
+        if len(chunk) != n:
+            raise SerializerError("Truncated BXJ1 file")
+        crc = zlib.crc32(chunk, crc)
+        return chunk
+
+    def blob() -> bytes:
+        return take(_U32.unpack(take(4))[0])
+
+    if take(4) != MAGIC:
+        raise SerializerError("Not a BXJ1 file")
+    if take(1)[0] == 0:
+        value = json.loads(blob())
+        if not keys and isinstance(value, dict):
+            yield from value.items()
+    else:
+        for _ in range(_U32.unpack(take(4))[0]):
+            key = blob().decode("utf-8")
+            if take(1)[0] == 0:
+                value = blob()
+                if not keys:
+                    yield key, json.loads(value)
+                continue
+            count = _U32.unpack(take(4))[0]
+            section = ((blob().decode("utf-8"), blob()) for _ in range(count))
+            if not keys:
+                yield key, {sub: json.loads(raw) for sub, raw in section}
+            elif keys == (key,):
+                for sub, raw in section:
+                    yield sub, json.loads(raw)
+            else:
+                for _ in section:
+                    pass
+    if _U32.unpack(fp.read(4))[0] != crc:
+        raise SerializerError("BXJ1 checksum mismatch")
@@ -1,36 +1,433 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import time
+from collections import OrderedDict
 from pathlib import Path
 from threading import Lock
 from typing import Any
 
+from core.latency import track
+from core.metrics import METRICS
+from core.serializers import Serializer, get_serializer, loads
+
+KeyPath = tuple[str, ...]
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _fingerprint(data: Any) -> dict[KeyPath, str]:
+    # Journal deltas are tracked two levels deep (e.g. guild_id -> member_id,
+    # "items" -> case_id), which is where every store in this bot changes.
+    if not isinstance(data, dict):
+        return {(): _compact(data)}
+    out: dict[KeyPath, str] = {}
+    for key, value in data.items():
+        if isinstance(value, dict) and value:
+            for sub, sub_value in value.items():
+                out[(key, sub)] = _compact(sub_value)
+        else:
+            out[(key,)] = _compact(value)
+    return out
+
+
+def _apply_op(data: Any, op: list[Any]) -> Any:
+    kind, path = op[0], op[1]
+    if not path:
+        return op[2] if kind == "s" else data
+    cur = data
+    for part in path[:-1]:
+        nxt = cur.get(part)
+        if not isinstance(nxt, dict):
+            if kind == "d":
+                return data
+            nxt = {}
+            cur[part] = nxt
+        cur = nxt
+    if kind == "s":
+        cur[path[-1]] = op[2]
+    else:
+        cur.pop(path[-1], None)
+    return data
+
 
 class JsonStore:
-    def __init__(self, path: str | Path, default: dict[str, Any] | list[Any]):
+    def __init__(
+        self,
+        path: str | Path,
+        default: dict[str, Any] | list[Any],
+        *,
+        write_behind: bool = False,
+        flush_interval: float = 5.0,
+        flush_threshold: int = 50,
+        journal: bool = False,
+        compact_bytes: int = 1 << 20,
+        fsync: bool = False,
+        serializer: str | Serializer = "json",
+        name: str | None = None,
+    ):
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Metrics label; shards of one ShardedJsonStore share their directory's name.
+        self.name = name or self.path.stem
+        self._labels = {op: (("store", self.name), ("op", op)) for op in ("read", "write", "update")}
+        self.journal_path = self.path.with_suffix(".journal")
         self.default = default
         self.lock = Lock()
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.journal = journal
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        # Snapshots are written with this format; reads detect whichever format is on disk.
+        self.serializer = get_serializer(serializer)
+        self._flush_lock = Lock()
+        self._data: Any = None
+        self._dirty = 0
+        self._fingerprints: dict[KeyPath, str] = {}
+        self._journal_size = 0
+        self._wake: asyncio.Event | None = None
+        self._flusher: asyncio.Task | None = None
+        self._closing = False
         self._ensure_file()
+        # Folds any journal left behind, even if journaling was since switched off.
+        self._recover()
+        if write_behind or journal:
+            self._data = self._load()
+            self._fingerprints = _fingerprint(self._data)
 
     def _ensure_file(self) -> None:
         if not self.path.exists():
-            self.path.write_text(json.dumps(self.default, indent=2), encoding="utf-8")
+            atomic_write_bytes(self.path, self._dump(self.default))
+
+    def _load(self) -> Any:
+        return loads(self.path.read_bytes())
+
+    def _dump(self, data: Any) -> bytes:
+        return self.serializer.dumps(data)
+
+    # ----- journal -----
+    def _recover(self) -> None:
+        if not self.journal_path.exists():
+            return
+        data = self._load()
+        with self.journal_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ops = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn tail from a crash mid-append; nothing after it is usable.
+                    break
+                for op in ops:
+                    data = _apply_op(data, op)
+        self._commit(None, self._dump(data))
+        if not self.journal:
+            self.journal_path.unlink()
+
+    def _diff(self) -> str | None:
+        new = _fingerprint(self._data)
+        old = self._fingerprints
+        ops = [f'["d",{_compact(list(p))}]' for p in old if p not in new]
+        ops += [f'["s",{_compact(list(p))},{enc}]' for p, enc in new.items() if old.get(p) != enc]
+        self._fingerprints = new
+        if not ops:
+            return None
+        return "[" + ",".join(ops) + "]"
+
+    def _append_journal(self, line: str) -> None:
+        with self.journal_path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    # ----- persistence -----
+    def _prepare(self) -> tuple[str | None, bytes | None] | None:
+        # Caller holds self.lock. Returns (journal delta, full snapshot) to commit.
+        # The store only counts as clean once the changes are serialized.
+        if not self._dirty:
+            return None
+        try:
+            pending = self._serialize()
+        except Exception:
+            self._failed()
+            raise
+        self._dirty = 0
+        return pending
+
+    def _serialize(self) -> tuple[str | None, bytes | None] | None:
+        if not self.journal:
+            return None, self._dump(self._data)
+        delta = self._diff()
+        if delta is None:
+            return None
+        self._journal_size += len(delta) + 1
+        if self._journal_size > self.compact_bytes:
+            self._journal_size = 0
+            return delta, self._dump(self._data)
+        return delta, None
+
+    def _commit(self, delta: str | None, snapshot: bytes | None) -> None:
+        with self._flush_lock:
+            # The delta is logged before compaction so a crash between the two
+            # replays onto the new snapshot without losing anything.
+            if delta is not None:
+                self._append_journal(delta)
+            if snapshot is not None:
+                atomic_write_bytes(self.path, snapshot)
+                if self.journal:
+                    self.journal_path.write_text("", encoding="utf-8")
 
     def read(self) -> Any:
-        with self.lock:
-            with self.path.open("r", encoding="utf-8") as f:
-                return json.load(f)
+        started = time.perf_counter()
+        try:
+            with track("storage"), self.lock:
+                # With write-behind or journaling the in-memory document is
+                # authoritative; callers must persist changes through write()/update().
+                if self._data is not None:
+                    return self._data
+                return self._load()
+        finally:
+            METRICS.observe("bot_store_operation_seconds", time.perf_counter() - started, self._labels["read"])
 
     def write(self, data: Any) -> None:
-        with self.lock:
-            self.path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        started = time.perf_counter()
+        try:
+            with track("storage"), self.lock:
+                if self._data is None:
+                    self._commit(None, self._dump(data))
+                    return
+                self._data = data
+                self._changed()
+        finally:
+            METRICS.observe("bot_store_operation_seconds", time.perf_counter() - started, self._labels["write"])
 
     def update(self, updater):
+        started = time.perf_counter()
+        try:
+            with track("storage"), self.lock:
+                if self._data is None:
+                    new_data = updater(self._load())
+                    self._commit(None, self._dump(new_data))
+                    return new_data
+                self._data = updater(self._data)
+                self._changed()
+                return self._data
+        finally:
+            METRICS.observe("bot_store_operation_seconds", time.perf_counter() - started, self._labels["update"])
+
+    def _changed(self) -> None:
+        self._dirty += 1
+        if not self.write_behind:
+            pending = self._prepare()
+            if pending is not None:
+                self._commit(*pending)
+        elif self._dirty >= self.flush_threshold and self._wake is not None:
+            self._wake.set()
+
+    # ----- write-behind -----
+    @property
+    def dirty(self) -> int:
+        return self._dirty
+
+    def _failed(self) -> None:
+        # Changes taken by _prepare were not persisted: keep the store dirty.
+        self._dirty = max(self._dirty, 1)
+        if self.journal:
+            # The lost delta may already be folded into the fingerprints, so
+            # force the next flush to compact into a full snapshot.
+            self._journal_size = self.compact_bytes
+            self._fingerprints = {}
+
+    def flush(self) -> bool:
+        with self.lock:
+            pending = self._prepare()
+        if pending is None:
+            return False
+        try:
+            self._commit(*pending)
+        except Exception:
+            self._failed()
+            raise
+        return True
+
+    async def flush_async(self) -> bool:
+        # Serialize on the loop thread (the document is only mutated there),
+        # then hand the file write to a worker thread.
+        with self.lock:
+            pending = self._prepare()
+        if pending is None:
+            return False
+        try:
+            await asyncio.to_thread(self._commit, *pending)
+        except Exception as e:
+            self._failed()
+            print(f"Failed to flush {self.path}: {e}")
+            return False
+        return True
+
+    def start_flusher(self) -> None:
+        if not self.write_behind or self._flusher is not None:
+            return
+        self._closing = False
+        self._wake = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush_async()
+            except Exception as e:
+                # Keep flushing later changes; this one stays dirty and is retried.
+                print(f"Failed to flush {self.path}: {e}")
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._closing = True
+            self._wake.set()
+            await self._flusher
+            self._flusher = None
+            self._wake = None
+        self.flush()
+
+
+class ShardedJsonStore:
+    # One JsonStore file per guild, loaded on first access and kept in a bounded LRU.
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        legacy_path: str | Path | None = None,
+        max_cached: int = 256,
+        write_behind: bool = False,
+        flush_interval: float = 5.0,
+        serializer: str | Serializer = "json",
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_cached = max_cached
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.serializer = get_serializer(serializer)
+        self.lock = Lock()
+        self._shards: OrderedDict[str, JsonStore] = OrderedDict()
+        self._evicted: dict[str, JsonStore] = {}
+        self._flusher: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._closing = False
+        if legacy_path is not None:
+            self._split_legacy(Path(legacy_path))
+        self._ids = {p.stem for p in self.directory.glob("*.json")}
+
+    def _split_legacy(self, legacy: Path) -> None:
+        if not legacy.exists() and not legacy.with_suffix(".journal").exists():
+            return
+        data = JsonStore(legacy, {}).read()
+        for guild_id, shard in data.items():
+            target = self.directory / f"{guild_id}.json"
+            if not target.exists():
+                atomic_write_bytes(target, self.serializer.dumps(shard))
+        os.replace(legacy, legacy.with_name(legacy.name + ".migrated"))
+
+    def _shard(self, guild_id: int | str) -> JsonStore:
+        key = str(guild_id)
         with self.lock:
-            with self.path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            new_data = updater(data)
-            self.path.write_text(json.dumps(new_data, indent=2), encoding="utf-8")
-            return new_data
+            store = self._shards.get(key)
+            if store is not None:
+                self._shards.move_to_end(key)
+                return store
+            # A dirty evicted shard still holds newer data than its file.
+            store = self._evicted.pop(key, None)
+            if store is None:
+                store = JsonStore(self.directory / f"{key}.json", {}, write_behind=self.write_behind, serializer=self.serializer, name=self.directory.name)
+            self._shards[key] = store
+            self._ids.add(key)
+            while len(self._shards) > self.max_cached:
+                old_key, evicted = self._shards.popitem(last=False)
+                if evicted.dirty:
+                    self._evicted[old_key] = evicted
+            return store
+
+    def guild_ids(self) -> list[str]:
+        return list(self._ids)
+
+    def read(self, guild_id: int | str) -> dict[str, Any]:
+        if str(guild_id) not in self._ids:
+            return {}
+        # The first access to a shard loads its file, so time the lookup too.
+        with track("storage"):
+            return self._shard(guild_id).read()
+
+    def write(self, guild_id: int | str, data: dict[str, Any]) -> None:
+        with track("storage"):
+            self._shard(guild_id).write(data)
+
+    def update(self, guild_id: int | str, updater) -> dict[str, Any]:
+        with track("storage"):
+            return self._shard(guild_id).update(updater)
+
+    # ----- write-behind -----
+    def _pending(self) -> list[JsonStore]:
+        return list(self._shards.values()) + list(self._evicted.values())
+
+    def _drop_flushed(self) -> None:
+        with self.lock:
+            for key, store in list(self._evicted.items()):
+                if not store.dirty:
+                    del self._evicted[key]
+
+    def flush(self) -> None:
+        for store in self._pending():
+            try:
+                store.flush()
+            except Exception as e:
+                print(f"Failed to flush {store.path}: {e}")
+        self._drop_flushed()
+
+    def start_flusher(self) -> None:
+        if not self.write_behind or self._flusher is not None:
+            return
+        self._closing = False
+        self._wake = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            for store in self._pending():
+                try:
+                    await store.flush_async()
+                except Exception as e:
+                    print(f"Failed to flush {store.path}: {e}")
+            self._drop_flushed()
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._closing = True
+            self._wake.set()
+            await self._flusher
+            self._flusher = None
+            self._wake = None
+        self.flush()
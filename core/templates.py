@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+
+
+class CompiledTemplate:
+    # A template split once into literal text and {name} slots. Rendering is a
+    # single join; values may be zero-arg callables, which only run if their
+    # slot is present. Unknown names are left in place as "{name}".
+    __slots__ = ("text", "segments", "names")
+
+    def __init__(self, text: str):
+        self.text = text
+        segments: list[tuple[str, str | None]] = []
+        pos = 0
+        for match in _PLACEHOLDER.finditer(text):
+            segments.append((text[pos:match.start()], match.group(1)))
+            pos = match.end()
+        segments.append((text[pos:], None))
+        self.segments = tuple(segments)
+        self.names = frozenset(name for _, name in segments if name is not None)
+
+    def render(self, values: Mapping[str, Any | Callable[[], Any]]) -> str:
+        if not self.names:
+            return self.text
+        resolved: dict[str, str] = {}
+        out: list[str] = []
+        for literal, name in self.segments:
+            out.append(literal)
+            if name is None:
+                continue
+            value = resolved.get(name)
+            if value is None:
+                if name not in values:
+                    value = "{" + name + "}"
+                else:
+                    raw = values[name]
+                    value = str(raw() if callable(raw) else raw)
+                resolved[name] = value
+            out.append(value)
+        return "".join(out)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(text: str) -> CompiledTemplate:
+    return CompiledTemplate(text)
+
+
+def render(text: str, values: Mapping[str, Any | Callable[[], Any]]) -> str:
+    return compile_template(text).render(values)
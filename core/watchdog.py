@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from core.latency import Histogram
+from core.metrics import METRICS
+
+_ASYNCIO_DIR = asyncio.__path__[0]
+
+
+class LoopWatchdog:
+    # A heartbeat task measures how late each short sleep wakes up (scheduling
+    # lag). A helper thread watches the heartbeat; when it stops for longer
+    # than `threshold`, the loop is stuck in one callback, so the thread grabs
+    # the loop thread's current stack while it is still blocking and logs it.
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, minutes: int = 15, keep_reports: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self._slots: deque[tuple[int, Histogram]] = deque(maxlen=minutes)
+        # (unix time, seconds blocked when captured, stack)
+        self.reports: deque[tuple[float, float, str]] = deque(maxlen=keep_reports)
+        self.stalls = 0
+        self.worst = 0.0
+        self._beat = time.monotonic()
+        self._captured = False
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def _slot(self) -> Histogram:
+        minute = int(time.time() // 60)
+        if not self._slots or self._slots[-1][0] != minute:
+            self._slots.append((minute, Histogram()))
+        return self._slots[-1][1]
+
+    async def _heartbeat(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - started - self.interval)
+            self._slot().observe(lag * 1000)
+            METRICS.observe("bot_event_loop_lag_seconds", lag)
+            if lag >= self.threshold:
+                self.stalls += 1
+                self.worst = max(self.worst, lag)
+                METRICS.inc("bot_event_loop_stalls_total")
+                print(f"Event loop was blocked for {lag * 1000:.0f}ms" + (" (stack logged above)" if self._captured else ""))
+            self._captured = False
+
+    def _watch(self) -> None:
+        while not self._stop.wait(min(self.interval, self.threshold / 2)):
+            blocked = time.monotonic() - self._beat - self.interval
+            if blocked < self.threshold or self._captured:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self._captured = True
+            frames = traceback.extract_stack(frame)
+            # Drop the event loop's own frames; the interesting part starts at the callback.
+            start = max((i + 1 for i, f in enumerate(frames) if f.filename.startswith(_ASYNCIO_DIR)), default=0)
+            stack = "".join(traceback.format_list(frames[start:] or frames))
+            self.reports.append((time.time(), blocked, stack))
+            print(f"Event loop blocked for {blocked * 1000:.0f}ms so far; loop thread is at:\n{stack}", end="")
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def window(self, minutes: int = 15) -> Histogram:
+        since = int(time.time() // 60) - minutes
+        merged = Histogram()
+        for minute, hist in self._slots:
+            if minute > since:
+                merged.merge(hist)
+        return merged
+
+    def format(self, minutes: int = 15) -> str:
+        hist = self.window(minutes)
+        return (
+            f"Loop lag p50={hist.quantile(0.5):.1f} p95={hist.quantile(0.95):.1f} p99={hist.quantile(0.99):.1f}ms ({minutes}m)\n"
+            f"Loop stalls>{self.threshold * 1000:.0f}ms={self.stalls} worst={self.worst * 1000:.0f}ms"
+        )
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any
+
+import aiohttp
+import discord
+
+UNAVAILABLE = "n/a"
+
+
+class WidgetProvider(ABC):
+    # One dashboard widget: fetch() returns template values for a guild.
+    # Results are cached per guild for `ttl` seconds by WidgetPipeline.
+    name = ""
+    label = ""
+    ttl = 60.0
+    default_enabled = False
+    keys: tuple[str, ...] = ()
+
+    @abstractmethod
+    async def fetch(self, bot, guild: discord.Guild) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def summary(self, values: dict[str, str]) -> str:
+        return values.get(self.keys[0], UNAVAILABLE)
+
+
+class SessionsWidget(WidgetProvider):
+    name = "sessions"
+    label = "Staff on duty"
+    ttl = 30.0
+    default_enabled = True
+    keys = ("session_status", "active_sessions")
+
+    async def fetch(self, bot, guild):
+        active = sum(1 for info in bot.session_store.read(guild.id).values() if info.get("active"))
+        return {"session_status": f"Online ({active} on duty)" if active else "Offline", "active_sessions": active}
+
+    def summary(self, values):
+        return values["session_status"]
+
+
+class _GlobalCountWidget(WidgetProvider):
+    # Counts records of a global store per guild. One pass over the store
+    # fills counts for every guild, so N dashboards cost one scan per TTL.
+    store_attr = ""
+
+    def __init__(self):
+        self._counts: Counter[int] = Counter()
+        self._counted_at = 0.0
+
+    def include(self, item: dict[str, Any]) -> bool:
+        return True
+
+    async def fetch(self, bot, guild):
+        if time.monotonic() - self._counted_at > self.ttl:
+            items = getattr(bot, self.store_attr).read().get("items", {})
+            self._counts = Counter(item.get("guild_id") for item in items.values() if self.include(item))
+            self._counted_at = time.monotonic()
+        return {self.keys[0]: self._counts.get(guild.id, 0)}
+
+
+class AppealsWidget(_GlobalCountWidget):
+    name = "appeals"
+    label = "Open appeals"
+    keys = ("open_appeals",)
+    store_attr = "appeal_store"
+
+    def include(self, item):
+        return item.get("status") == "pending"
+
+
+class CasesWidget(_GlobalCountWidget):
+    name = "cases"
+    label = "Cases"
+    keys = ("case_count",)
+    store_attr = "case_store"
+
+
+class WarningsWidget(WidgetProvider):
+    name = "warnings"
+    label = "Warnings"
+    ttl = 120.0
+    keys = ("warning_count", "warned_users")
+
+    async def fetch(self, bot, guild):
+        warned = [w for w in bot.warn_store.read(guild.id).values() if w]
+        return {"warning_count": sum(len(w) for w in warned), "warned_users": len(warned)}
+
+    def summary(self, values):
+        if values["warning_count"] == UNAVAILABLE:
+            return UNAVAILABLE
+        return f"{values['warning_count']} across {values['warned_users']} members"
+
+
+class GameWidget(WidgetProvider):
+    # Live player count for the guild's Roblox experience (guild config: roblox_universe_id).
+    name = "game"
+    label = "Players in game"
+    ttl = 60.0
+    keys = ("game_players",)
+    url = "https://games.roblox.com/v1/games?universeIds={}"
+
+    def __init__(self):
+        self._session: aiohttp.ClientSession | None = None
+
+    async def fetch(self, bot, guild):
+        universe_id = bot.guild_store.read(guild.id).get("roblox_universe_id")
+        if not universe_id:
+            return {}
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        async with self._session.get(self.url.format(int(universe_id))) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        games = data.get("data") or []
+        return {"game_players": f"{games[0].get('playing', 0):,}" if games else UNAVAILABLE}
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+def default_widgets() -> list[WidgetProvider]:
+    return [SessionsWidget(), AppealsWidget(), CasesWidget(), WarningsWidget(), GameWidget()]
+
+
+class WidgetPipeline:
+    # Gathers enabled widgets concurrently. A provider that misses the render
+    # timeout keeps running in the background and refills the cache when it
+    # finishes; meanwhile the render uses its last cached values (or n/a).
+    def __init__(self, bot, providers: list[WidgetProvider] | None = None, timeout: float = 2.0):
+        self.bot = bot
+        self.providers = {p.name: p for p in (providers if providers is not None else default_widgets())}
+        self.timeout = timeout
+        self._cache: dict[tuple[str, int], tuple[float, dict[str, str]]] = {}
+        self._inflight: dict[tuple[str, int], asyncio.Task] = {}
+        self.timeouts: Counter[str] = Counter()
+        self.failures: Counter[str] = Counter()
+
+    def enabled(self, guild_id: int) -> list[WidgetProvider]:
+        toggles = self.bot.guild_store.read(guild_id).get("widgets", {})
+        return [p for name, p in self.providers.items() if toggles.get(name, p.default_enabled)]
+
+    def cached(self, provider: WidgetProvider, guild_id: int) -> dict[str, str]:
+        entry = self._cache.get((provider.name, guild_id))
+        values = dict(entry[1]) if entry else {}
+        for key in provider.keys:
+            values.setdefault(key, UNAVAILABLE)
+        return values
+
+    async def _fetch(self, provider: WidgetProvider, guild: discord.Guild) -> None:
+        key = (provider.name, guild.id)
+        try:
+            values = await provider.fetch(self.bot, guild)
+            self._cache[key] = (time.monotonic() + provider.ttl, {k: str(v) for k, v in values.items()})
+        except Exception as e:
+            self.failures[provider.name] += 1
+            print(f"Widget {provider.name} failed for guild {guild.id}: {e}")
+        finally:
+            self._inflight.pop(key, None)
+
+    async def collect(self, guild: discord.Guild) -> dict[WidgetProvider, dict[str, str]]:
+        providers = self.enabled(guild.id)
+        now = time.monotonic()
+        pending = []
+        for provider in providers:
+            key = (provider.name, guild.id)
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                continue
+            task = self._inflight.get(key)
+            if task is None:
+                task = self._inflight[key] = asyncio.create_task(self._fetch(provider, guild))
+            pending.append((provider, task))
+        if pending:
+            _, late = await asyncio.wait([task for _, task in pending], timeout=self.timeout)
+            for provider, task in pending:
+                if task in late:
+                    self.timeouts[provider.name] += 1
+        return {provider: self.cached(provider, guild.id) for provider in providers}
+
+    def invalidate(self, guild_id: int, name: str | None = None) -> None:
+        for key in [k for k in self._cache if k[1] == guild_id and (name is None or k[0] == name)]:
+            del self._cache[key]
+
+    async def close(self) -> None:
+        for task in list(self._inflight.values()):
+            task.cancel()
+        for provider in self.providers.values():
+            close = getattr(provider, "close", None)
+            if close is not None:
+                await close()
@@ -6,9 +6,13 @@ import os
 import discord
 from discord.ext import commands
 
+from core.latency import LatencyRegistry, TimedCommandTree, instrument_http, measure
+from core.metrics import METRICS, MetricsServer, bot_collector
+from core.watchdog import LoopWatchdog
 from services.erlc_client import ERLCClient
 from services.maple_client import MapleClient
-from utils.db import Database
+from utils.async_db import AsyncDatabase
+from utils.embed_templates import TemplateRegistry
 
 COGS = [
     "cogs.config_cog",
@@ -26,13 +30,33 @@ class AllInOneBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
         intents.members = True
-        super().__init__(command_prefix=".", intents=intents)
-        self.db = Database("data/bot.db")
+        super().__init__(command_prefix=".", intents=intents, tree_cls=TimedCommandTree)
+        self.command_latency = LatencyRegistry()
+        self.metrics_server: MetricsServer | None = None
+        self.loop_watchdog: LoopWatchdog | None = None
+        instrument_http(self)
+        self.db = AsyncDatabase("data/bot.db")
+        self.templates = TemplateRegistry(self.db)
         self.owner_ids = [int(x) for x in os.getenv("OWNER_IDS", "").split(",") if x.strip().isdigit()]
         self.erlc = ERLCClient(os.getenv("ERLC_API_KEY"))
         self.maple = MapleClient(os.getenv("MAPLE_API_KEY"))
 
+    async def invoke(self, ctx: commands.Context):
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        with measure(self.command_latency, f"prefix:{ctx.command.qualified_name}"):
+            await super().invoke(ctx)
+
     async def setup_hook(self):
+        block_ms = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "250"))
+        if block_ms > 0:
+            self.loop_watchdog = LoopWatchdog(threshold=block_ms / 1000)
+            self.loop_watchdog.start()
+        port = os.getenv("METRICS_PORT", "").strip()
+        if port:
+            METRICS.add_collector(bot_collector(self))
+            self.metrics_server = MetricsServer(os.getenv("METRICS_HOST", "127.0.0.1"), int(port))
+            await self.metrics_server.start()
         for ext in COGS:
             await self.load_extension(ext)
         await self.tree.sync()
@@ -44,13 +68,24 @@ class AllInOneBot(commands.Bot):
         )
         print(f"Logged in as {self.user} ({self.user.id})")
 
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            if self.loop_watchdog is not None:
+                self.loop_watchdog.stop()
+            if self.metrics_server is not None:
+                await self.metrics_server.stop()
+            await self.db.close()
+
 
 async def main():
     token = os.getenv("BOT_TOKEN")
     if not token:
         raise SystemExit("Missing BOT_TOKEN in environment")
     bot = AllInOneBot()
-    await bot.start(token)
+    async with bot:
+        await bot.start(token)
 
 
 if __name__ == "__main__":
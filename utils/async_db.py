@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from core.latency import track_future
+from utils.db import Database
+
+MAX_BATCH = 256
+
+
+def _resolve(fut: asyncio.Future, result: Any, error: BaseException | None) -> None:
+    if fut.cancelled():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+class AsyncDatabase:
+    # Runs every Database call off the event loop: writes on one dedicated
+    # writer thread, SELECT-only methods on a pool of read-only connections
+    # (concurrent with writes under WAL). Any public Database method is
+    # available as an awaitable of the same name, e.g.
+    # `await bot.db.get_balance(gid, uid)`.
+    def __init__(self, path: str = "data/bot.db", group_commit_ms: float | None = None, readers: int | None = None):
+        self.path = Path(path)
+        if group_commit_ms is None:
+            group_commit_ms = float(os.getenv("DB_GROUP_COMMIT_MS", "2"))
+        if readers is None:
+            readers = int(os.getenv("DB_READERS", "4"))
+        self.group_commit = group_commit_ms / 1000
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._read_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._db: Database | None = None
+        self._thread = self._start(self._worker, "db-writer")
+        self._readers = [self._start(self._reader, f"db-reader-{i}") for i in range(readers)]
+
+    def _start(self, target: Callable[[threading.Event, list], None], name: str) -> threading.Thread:
+        ready = threading.Event()
+        errors: list[BaseException] = []
+        thread = threading.Thread(target=target, args=(ready, errors), name=name, daemon=True)
+        thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return thread
+
+    def _reader(self, ready: threading.Event, errors: list) -> None:
+        try:
+            db = Database(str(self.path), readonly=True, cache=self._db.cache, tracer=self._db.tracer)
+        except BaseException as e:
+            errors.append(e)
+            ready.set()
+            return
+        ready.set()
+        while True:
+            job = self._read_queue.get()
+            if job is None:
+                break
+            fn, args, kwargs, fut, loop = job
+            result, error = None, None
+            try:
+                result = fn(db, *args, **kwargs)
+            except Exception as e:
+                error = e
+            loop.call_soon_threadsafe(_resolve, fut, result, error)
+        db.conn.close()
+
+    def _worker(self, ready: threading.Event, errors: list) -> None:
+        try:
+            self._db = Database(str(self.path))
+        except BaseException as e:
+            errors.append(e)
+            ready.set()
+            return
+        ready.set()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                break
+            # Group commit: jobs arriving within the window share one transaction.
+            deadline = time.monotonic() + self.group_commit
+            while len(batch) < MAX_BATCH:
+                try:
+                    job = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if job is None:
+                    running = False
+                    break
+                batch.append(job)
+            self._run_batch(batch)
+        self._db.conn.close()
+
+    def _run_batch(self, batch: list[tuple]) -> None:
+        db = self._db
+        outcomes = []
+        try:
+            with db.transaction():
+                for fn, args, kwargs, fut, loop in batch:
+                    # Each job gets its own savepoint so one failure only
+                    # rolls back that job's writes.
+                    try:
+                        with db.transaction():
+                            outcomes.append((fut, loop, fn(db, *args, **kwargs), None))
+                    except Exception as e:
+                        outcomes.append((fut, loop, None, e))
+        except BaseException as e:
+            # The shared commit failed, so nothing in the batch was persisted.
+            outcomes = [(fut, loop, None, e) for _, _, _, fut, loop in batch]
+        # Futures resolve only after COMMIT so callers never see unpersisted writes.
+        for fut, loop, result, error in outcomes:
+            loop.call_soon_threadsafe(_resolve, fut, result, error)
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> asyncio.Future:
+        # fn(db, *args, **kwargs) runs on the worker thread; use it to group
+        # several statements that must not interleave with other commands.
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        track_future(fut)
+        self._queue.put((fn, args, kwargs, fut, loop))
+        return fut
+
+    def read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> asyncio.Future:
+        # Like run(), but on a read-only connection; fn must not write.
+        if not self._readers:
+            return self.run(fn, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        track_future(fut)
+        self._read_queue.put((fn, args, kwargs, fut, loop))
+        return fut
+
+    def __getattr__(self, name: str):
+        method = getattr(Database, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+        dispatch = self.read if name in Database.READ_METHODS else self.run
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await dispatch(method, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    # ----- cached reads -----
+    # Cache hits are answered on the event loop without a thread round trip.
+    async def get_guild_config(self, guild_id: int):
+        cached = self._db.cached(guild_id, "config")
+        if cached is not None:
+            return cached
+        return await self.run(Database.get_guild_config, guild_id)
+
+    async def get_permission_roles(self, guild_id: int, group_name: str):
+        cached = self._db.cached(guild_id, ("perm", group_name))
+        if cached is not None:
+            return cached
+        return await self.read(Database.get_permission_roles, guild_id, group_name)
+
+    async def get_variables(self, guild_id: int):
+        cached = self._db.cached(guild_id, "variables")
+        if cached is not None:
+            return cached
+        return await self.read(Database.get_variables, guild_id)
+
+    def cache_stats(self) -> dict[str, int]:
+        return self._db.cache_stats()
+
+    @property
+    def tracer(self):
+        return self._db.tracer
+
+    # ----- ad-hoc queries -----
+    async def execute(self, q: str, args: tuple = ()) -> int:
+        return await self.run(lambda db: db._exec(q, args).lastrowid)
+
+    def _dispatch(self, q: str):
+        return self.read if q.lstrip()[:6].upper() == "SELECT" else self.run
+
+    async def fetchone(self, q: str, args: tuple = ()):
+        return await self._dispatch(q)(lambda db: db._exec(q, args).fetchone())
+
+    async def fetchall(self, q: str, args: tuple = ()):
+        return await self._dispatch(q)(lambda db: db._exec(q, args).fetchall())
+
+    async def execute_many(self, q: str, rows) -> int:
+        rows = list(rows)
+        return await self.run(lambda db: db._exec_many(q, rows))
+
+    async def close(self) -> None:
+        for _ in self._readers:
+            self._read_queue.put(None)
+        self._queue.put(None)
+        for thread in [*self._readers, self._thread]:
+            await asyncio.to_thread(thread.join)
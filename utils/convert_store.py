@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from core.serializers import SERIALIZERS, get_serializer, loads
+from core.storage import JsonStore, atomic_write_bytes
+
+
+def convert_file(path: Path, to: str, out: Path | None = None) -> tuple[int, int]:
+    # Folds any pending journal first, so stop the bot before converting in place.
+    before = path.stat().st_size
+    JsonStore(path, {})
+    data = loads(path.read_bytes())
+    target = out or path
+    atomic_write_bytes(target, get_serializer(to).dumps(data))
+    return before, target.stat().st_size
+
+
+def convert(path: str | Path, to: str, out: str | Path | None = None) -> list[tuple[Path, int, int]]:
+    path = Path(path)
+    if path.is_dir():
+        # A sharded store: convert every guild file in place.
+        return [(shard, *convert_file(shard, to)) for shard in sorted(path.glob("*.json"))]
+    return [(path, *convert_file(path, to, Path(out) if out else None))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a JsonStore file (or a sharded store directory) between formats.")
+    parser.add_argument("path", help="store file, e.g. data/cases.json, or shard directory, e.g. data/guilds")
+    parser.add_argument("--to", choices=list(SERIALIZERS), default="json-pretty")
+    parser.add_argument("--out", default=None, help="write to this file instead of converting in place")
+    args = parser.parse_args()
+    total_before = total_after = 0
+    for path, before, after in convert(args.path, args.to, args.out):
+        total_before += before
+        total_after += after
+    print(f"Converted {args.path} to {args.to}: {total_before:,} -> {total_after:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,352 @@
 from __future__ import annotations
 
 import json
+import os
+import re
 import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
 from pathlib import Path
+from threading import Lock
+from types import MappingProxyType
+from typing import Any
+
+from core.metrics import METRICS
+
+JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"}
+SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+_KIND_LABELS: dict[str, tuple[tuple[str, str], ...]] = {}
+
+
+def _query_labels(q: str) -> tuple[tuple[str, str], ...]:
+    # Labelled by statement verb only, so the label set stays small.
+    kind = q.lstrip()[:6].upper().rstrip()
+    labels = _KIND_LABELS.get(kind)
+    if labels is None:
+        labels = _KIND_LABELS[kind] = (("kind", kind),)
+    return labels
+
+
+def load_pragmas() -> dict[str, Any]:
+    # Storage profile, tunable from .env. WAL lets readers run alongside the writer;
+    # synchronous=NORMAL is durable against app crashes and only fsyncs at checkpoints.
+    journal_mode = os.getenv("DB_JOURNAL_MODE", "WAL").upper()
+    synchronous = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"DB_JOURNAL_MODE must be one of {sorted(JOURNAL_MODES)}")
+    if synchronous not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"DB_SYNCHRONOUS must be one of {sorted(SYNCHRONOUS_LEVELS)}")
+    return {
+        "journal_mode": journal_mode,
+        "synchronous": synchronous,
+        # Negative cache_size is in KiB rather than pages.
+        "cache_size": -int(os.getenv("DB_CACHE_SIZE_KB", "16384")),
+        "mmap_size": int(os.getenv("DB_MMAP_SIZE_MB", "256")) * 1024 * 1024,
+        "busy_timeout": int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000")),
+        "temp_store": "MEMORY",
+    }
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLAC", "WITH")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(q: str) -> str:
+    # Query shape: literals become ?, IN lists collapse, whitespace is squeezed.
+    q = _STRING.sub("?", q)
+    q = _NUMBER.sub("?", q)
+    q = _IN_LIST.sub("IN (...)", q)
+    return _SPACE.sub(" ", q).strip()
+
+
+class QueryStats:
+    __slots__ = ("calls", "total", "max", "slow", "plan")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.plan: str | None = None
+
+
+class QueryTracer:
+    # Per-shape timings for every statement run through Database._exec, shared
+    # by the writer and reader connections. A statement slower than the
+    # threshold is logged with its EXPLAIN QUERY PLAN, captured once per shape.
+    MAX_SHAPES = 1000
+
+    def __init__(self, slow_ms: float | None = None):
+        if slow_ms is None:
+            slow_ms = float(os.getenv("DB_SLOW_QUERY_MS", "50"))
+        self.slow_seconds = slow_ms / 1000
+        self._stats: dict[str, QueryStats] = {}
+        self._lock = Lock()
+
+    def record(self, conn: sqlite3.Connection, q: str, args: Any, elapsed: float) -> None:
+        shape = normalize_sql(q)
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                if len(self._stats) >= self.MAX_SHAPES:
+                    return
+                stats = self._stats[shape] = QueryStats()
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            if elapsed < self.slow_seconds:
+                return
+            stats.slow += 1
+            plan = stats.plan
+        if plan is None and args is not None:
+            plan = stats.plan = self.explain(conn, q, args)
+        print(f"Slow query ({elapsed * 1000:.0f}ms): {shape}" + (f"\n  plan: {plan}" if plan else ""))
+
+    @staticmethod
+    def explain(conn: sqlite3.Connection, q: str, args: Any) -> str | None:
+        if not q.lstrip()[:6].upper().startswith(_EXPLAINABLE):
+            return None
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {q}", args).fetchall()
+        except sqlite3.Error as e:
+            return f"unavailable ({e})"
+        return " | ".join(row[3] for row in rows)
+
+    def top(self, limit: int = 10) -> list[tuple[str, QueryStats]]:
+        # Slowest data statements by worst single run; one-off schema DDL is left out.
+        with self._lock:
+            rows = [item for item in self._stats.items() if item[0][:6].upper().startswith(_EXPLAINABLE)]
+        rows.sort(key=lambda item: item[1].max, reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def _freeze(value: Any) -> Any:
+    # Cached values are shared between callers, so hand out read-only views.
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class GuildCache:
+    # Per-guild read cache shared by the writer and reader connections.
+    # guild_id -> {"config" | "variables" | ("perm", group) | ("template", name): frozen value}
+    def __init__(self):
+        self._entries: dict[int, dict[Any, Any]] = {}
+        self._generations: dict[int, int] = {}
+        self._epoch = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, guild_id: int, key: Any) -> Any | None:
+        # Safe from any thread: a single dict lookup, no SQL.
+        entry = self._entries.get(guild_id)
+        value = entry.get(key) if entry is not None else None
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def token(self, guild_id: int) -> tuple[int, int]:
+        return self._epoch, self._generations.get(guild_id, 0)
+
+    def remember(self, guild_id: int, key: Any, value: Any, token: tuple[int, int]) -> Any:
+        # A read only lands in the cache if nothing for that guild was
+        # invalidated since it started; otherwise it may predate a commit.
+        frozen = _freeze(value)
+        with self._lock:
+            self.misses += 1
+            if token == self.token(guild_id):
+                self._entries.setdefault(guild_id, {})[key] = frozen
+        return frozen
+
+    def invalidate(self, guild_id: int, key: Any) -> None:
+        with self._lock:
+            self._generations[guild_id] = self._generations.get(guild_id, 0) + 1
+            entry = self._entries.get(guild_id)
+            if entry is not None:
+                entry.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "guilds": len(self._entries)}
+
+
+def _atomic(fn):
+    # Runs a multi-statement method as one transaction (a savepoint if nested).
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self.transaction():
+            return fn(self, *args, **kwargs)
+
+    return wrapper
 
 
 class Database:
-    def __init__(self, path: str = "data/bot.db"):
+    # SELECT-only methods; AsyncDatabase runs these on its read-only connections.
+    READ_METHODS = frozenset({
+        "get_permission_roles", "get_variables", "get_template", "get_premium",
+        "top_balances", "list_shop_items", "list_inventory",
+    })
+
+    def __init__(
+        self,
+        path: str = "data/bot.db",
+        schema_version: int | None = None,
+        *,
+        readonly: bool = False,
+        cache: GuildCache | None = None,
+        pragmas: dict[str, Any] | None = None,
+        tracer: QueryTracer | None = None,
+    ):
         self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(self.path)
+        self.readonly = readonly
+        self.cache = cache or GuildCache()
+        self.tracer = tracer or QueryTracer()
+        self._depth = 0
+        self._touched: set[tuple[int, Any]] = set()
+        if readonly:
+            self.conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, isolation_level=None)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode: statements outside transaction() commit on their own,
+            # inside one they share a single commit.
+            self.conn = sqlite3.connect(self.path, isolation_level=None)
         self.conn.row_factory = sqlite3.Row
-        self._init_schema()
+        self._apply_pragmas(load_pragmas() if pragmas is None else pragmas)
+        if not readonly:
+            self._init_schema(schema_version)
+
+    def _apply_pragmas(self, pragmas: dict[str, Any]) -> None:
+        for name, value in pragmas.items():
+            if name == "journal_mode" and self.readonly:
+                continue
+            self.conn.execute(f"PRAGMA {name}={value}")
+        if self.readonly:
+            self.conn.execute("PRAGMA query_only=ON")
 
     def _exec(self, q: str, args: tuple = ()):
-        cur = self.conn.cursor()
-        cur.execute(q, args)
-        self.conn.commit()
-        return cur
+        started = time.perf_counter()
+        try:
+            cur = self.conn.cursor()
+            cur.execute(q, args)
+            return cur
+        finally:
+            elapsed = time.perf_counter() - started
+            METRICS.observe("bot_db_query_seconds", elapsed, _query_labels(q))
+            self.tracer.record(self.conn, q, args, elapsed)
+
+    def _exec_many(self, q: str, rows) -> int:
+        started = time.perf_counter()
+        try:
+            cur = self.conn.cursor()
+            cur.executemany(q, rows)
+            return cur.rowcount
+        finally:
+            elapsed = time.perf_counter() - started
+            METRICS.observe("bot_db_query_seconds", elapsed, _query_labels(q))
+            # No single row to explain with; bulk inserts are timed but not planned.
+            self.tracer.record(self.conn, q, None, elapsed)
+
+    @contextmanager
+    def transaction(self):
+        # The outermost scope is a real transaction; nested scopes are
+        # savepoints, so an inner failure only rolls back its own writes.
+        name = f"sp{self._depth}"
+        outer = self._depth == 0
+        self.conn.execute("BEGIN IMMEDIATE" if outer else f"SAVEPOINT {name}")
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if outer:
+                self.conn.execute("ROLLBACK")
+            else:
+                self.conn.execute(f"ROLLBACK TO {name}")
+                self.conn.execute(f"RELEASE {name}")
+            # Cached reads taken inside the scope may hold rolled-back data.
+            if outer:
+                self._touched.clear()
+            self.cache.clear()
+            raise
+        if not outer:
+            try:
+                self.conn.execute(f"RELEASE {name}")
+            finally:
+                self._depth -= 1
+            return
+        try:
+            self.conn.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT (busy, disk full) can leave the transaction open;
+            # roll it back so the next BEGIN on this connection still works.
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            self._touched.clear()
+            self.cache.clear()
+            raise
+        finally:
+            self._depth -= 1
+        # Invalidate again now the write is visible, so a reader that
+        # started before COMMIT cannot cache the old value.
+        for guild_id, key in self._touched:
+            self.cache.invalidate(guild_id, key)
+        self._touched.clear()
+
+    # ----- read cache -----
+    def cached(self, guild_id: int, key: Any) -> Any | None:
+        return self.cache.get(guild_id, key)
 
-    def _init_schema(self):
+    def _invalidate(self, guild_id: int, key: Any) -> None:
+        self.cache.invalidate(guild_id, key)
+        if self._depth:
+            self._touched.add((guild_id, key))
+
+    def cache_stats(self) -> dict[str, int]:
+        return self.cache.stats()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._depth > 0
+
+    # ----- schema -----
+    def schema_version(self) -> int:
+        row = self._exec("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] or 0
+
+    def _init_schema(self, target: int | None = None):
+        self._exec("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)")
+        current = self.schema_version()
+        if current > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} is at schema version {current}, newer than this bot supports ({SCHEMA_VERSION})")
+        target = SCHEMA_VERSION if target is None else target
+        for version, (name, step) in enumerate(MIGRATIONS[current:target], start=current + 1):
+            # Each step commits together with its version row, so an interrupted
+            # upgrade resumes at the first step that did not finish.
+            with self.transaction():
+                step(self)
+                self._exec("INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)", (version, name, datetime.now(timezone.utc).isoformat()))
+            print(f"Applied schema migration {version}: {name}")
+
+    def _create_tables(self):
         self._exec("""
         CREATE TABLE IF NOT EXISTS guild_config (
           guild_id INTEGER PRIMARY KEY,
@@ -52,11 +379,30 @@ class Database:
         self._exec("CREATE TABLE IF NOT EXISTS economy_inventory (guild_id INTEGER, user_id INTEGER, item_id INTEGER, qty INTEGER, PRIMARY KEY (guild_id, user_id, item_id))")
         self._exec("CREATE TABLE IF NOT EXISTS api_action_audit (id INTEGER PRIMARY KEY AUTOINCREMENT, guild_id INTEGER, actor_id INTEGER, provider TEXT, action_key TEXT, target TEXT, result_json TEXT, created_at TEXT)")
 
+    def _add_hot_indexes(self):
+        # Per-user history lists read rows in id (rowid) order, which these
+        # indexes already yield, so ORDER BY id DESC LIMIT n needs no sort.
+        self._exec("CREATE INDEX IF NOT EXISTS idx_infractions_guild_user ON infractions (guild_id, user_id)")
+        self._exec("CREATE INDEX IF NOT EXISTS idx_staff_events_guild_user ON staff_events (guild_id, user_id)")
+        # Covers the open-session lookup in /session end without touching the table.
+        self._exec("CREATE INDEX IF NOT EXISTS idx_sessions_guild_user_open ON sessions (guild_id, user_id, ended_at)")
+        # Covers top_balances: already sorted per guild and carries user_id.
+        self._exec("CREATE INDEX IF NOT EXISTS idx_economy_users_leaderboard ON economy_users (guild_id, balance DESC, user_id)")
+        self._exec("CREATE INDEX IF NOT EXISTS idx_appeals_guild ON appeals (guild_id)")
+        self._exec("CREATE INDEX IF NOT EXISTS idx_shop_items_guild ON economy_shop_items (guild_id)")
+
     # ----- config -----
     def ensure_guild(self, guild_id: int):
         self._exec("INSERT OR IGNORE INTO guild_config (guild_id) VALUES (?)", (guild_id,))
 
-    def get_guild_config(self, guild_id: int) -> dict:
+    def get_guild_config(self, guild_id: int) -> MappingProxyType:
+        cached = self.cached(guild_id, "config")
+        if cached is not None:
+            return cached
+        token = self.cache.token(guild_id)
+        return self.cache.remember(guild_id, "config", self._load_guild_config(guild_id), token)
+
+    def _load_guild_config(self, guild_id: int) -> dict:
         self.ensure_guild(guild_id)
         row = self._exec("SELECT * FROM guild_config WHERE guild_id=?", (guild_id,)).fetchone()
         return {
@@ -71,8 +417,10 @@ class Database:
             "economy_settings": {**{"currency_name": "Credits", "starting_balance": 1000, "daily_amount": 300, "work_min": 50, "work_max": 220, "daily_cooldown_h": 24, "work_cooldown_m": 30, "transfer_max": 50000, "transfer_tax_percent": 0}, **json.loads(row["economy_settings_json"] or "{}")},
         }
 
+    @_atomic
     def update_guild_config(self, guild_id: int, key: str, value):
-        cfg = self.get_guild_config(guild_id)
+        cfg = self._load_guild_config(guild_id)
+        self._invalidate(guild_id, "config")
         if key == "channels":
             self._exec("UPDATE guild_config SET channels_json=? WHERE guild_id=?", (json.dumps(value), guild_id))
         elif key == "module_enabled":
@@ -101,28 +449,44 @@ class Database:
             }
             self._exec("UPDATE guild_config SET webhook_settings_json=? WHERE guild_id=?", (json.dumps(webhook_data), guild_id))
 
-    def get_permission_roles(self, guild_id: int, group_name: str) -> list[int]:
+    def get_permission_roles(self, guild_id: int, group_name: str) -> tuple[int, ...]:
+        cached = self.cached(guild_id, ("perm", group_name))
+        if cached is not None:
+            return cached
+        token = self.cache.token(guild_id)
         rows = self._exec("SELECT role_id FROM guild_permissions WHERE guild_id=? AND group_name=?", (guild_id, group_name)).fetchall()
-        return [r[0] for r in rows]
+        return self.cache.remember(guild_id, ("perm", group_name), [r[0] for r in rows], token)
 
+    @_atomic
     def set_permission_roles(self, guild_id: int, group_name: str, role_ids: list[int]):
+        self._invalidate(guild_id, ("perm", group_name))
         self._exec("DELETE FROM guild_permissions WHERE guild_id=? AND group_name=?", (guild_id, group_name))
-        for rid in role_ids:
-            self._exec("INSERT OR IGNORE INTO guild_permissions (guild_id, group_name, role_id) VALUES (?, ?, ?)", (guild_id, group_name, rid))
+        self._exec_many("INSERT OR IGNORE INTO guild_permissions (guild_id, group_name, role_id) VALUES (?, ?, ?)", [(guild_id, group_name, rid) for rid in role_ids])
 
     def set_variable(self, guild_id: int, key: str, value: str):
+        self._invalidate(guild_id, "variables")
         self._exec("INSERT OR REPLACE INTO guild_variables (guild_id, key, value) VALUES (?, ?, ?)", (guild_id, key, value))
 
-    def get_variables(self, guild_id: int) -> dict[str, str]:
+    def get_variables(self, guild_id: int) -> MappingProxyType:
+        cached = self.cached(guild_id, "variables")
+        if cached is not None:
+            return cached
+        token = self.cache.token(guild_id)
         rows = self._exec("SELECT key, value FROM guild_variables WHERE guild_id=?", (guild_id,)).fetchall()
-        return {r[0]: r[1] for r in rows}
+        return self.cache.remember(guild_id, "variables", {r[0]: r[1] for r in rows}, token)
 
     def set_template(self, guild_id: int, name: str, payload_json: str):
+        self._invalidate(guild_id, ("template", name))
         self._exec("INSERT OR REPLACE INTO embed_templates (guild_id, name, json_payload) VALUES (?, ?, ?)", (guild_id, name, payload_json))
 
     def get_template(self, guild_id: int, name: str) -> str | None:
+        cached = self.cached(guild_id, ("template", name))
+        if cached is not None:
+            return cached or None
+        token = self.cache.token(guild_id)
         row = self._exec("SELECT json_payload FROM embed_templates WHERE guild_id=? AND name=?", (guild_id, name)).fetchone()
-        return row[0] if row else None
+        # "" caches a missing template so lookups for unset names stay cheap.
+        return self.cache.remember(guild_id, ("template", name), row[0] if row else "", token) or None
 
     # ----- premium -----
     def set_premium(self, guild_id: int, expires_at: str):
@@ -136,6 +500,7 @@ class Database:
         return row[0] if row else None
 
     # ----- economy -----
+    @_atomic
     def ensure_economy_user(self, guild_id: int, user_id: int):
         cfg = self.get_guild_config(guild_id)["economy_settings"]
         self._exec("INSERT OR IGNORE INTO economy_users (guild_id, user_id, balance) VALUES (?, ?, ?)", (guild_id, user_id, cfg["starting_balance"]))
@@ -145,10 +510,12 @@ class Database:
         row = self._exec("SELECT balance FROM economy_users WHERE guild_id=? AND user_id=?", (guild_id, user_id)).fetchone()
         return int(row[0])
 
+    @_atomic
     def change_balance(self, guild_id: int, user_id: int, delta: int):
         self.ensure_economy_user(guild_id, user_id)
         self._exec("UPDATE economy_users SET balance = balance + ? WHERE guild_id=? AND user_id=?", (delta, guild_id, user_id))
 
+    @_atomic
     def set_cooldown(self, guild_id: int, user_id: int, field: str, iso: str):
         assert field in {"daily_at", "work_at"}
         self.ensure_economy_user(guild_id, user_id)
@@ -159,6 +526,37 @@ class Database:
         row = self._exec("SELECT daily_at, work_at FROM economy_users WHERE guild_id=? AND user_id=?", (guild_id, user_id)).fetchone()
         return {"daily_at": row[0], "work_at": row[1]}
 
+    # Check-and-update helpers: each runs in one transaction (and one job on
+    # the async worker) so concurrent commands cannot interleave between the
+    # check and the write.
+    @_atomic
+    def transfer_balance(self, guild_id: int, from_id: int, to_id: int, amount: int, received: int) -> bool:
+        if self.get_balance(guild_id, from_id) < amount:
+            return False
+        self.change_balance(guild_id, from_id, -amount)
+        self.change_balance(guild_id, to_id, received)
+        return True
+
+    @_atomic
+    def claim_reward(self, guild_id: int, user_id: int, field: str, amount: int, cooldown: timedelta, now: datetime) -> timedelta | None:
+        last = self.get_cooldowns(guild_id, user_id)[field]
+        if last and now - datetime.fromisoformat(last) < cooldown:
+            return cooldown - (now - datetime.fromisoformat(last))
+        self.change_balance(guild_id, user_id, amount)
+        self.set_cooldown(guild_id, user_id, field, now.isoformat())
+        return None
+
+    @_atomic
+    def buy_item(self, guild_id: int, user_id: int, item_id: int) -> tuple[sqlite3.Row | None, bool]:
+        row = self._exec("SELECT * FROM economy_shop_items WHERE guild_id=? AND id=?", (guild_id, item_id)).fetchone()
+        if not row:
+            return None, False
+        if self.get_balance(guild_id, user_id) < row["price"]:
+            return row, False
+        self.change_balance(guild_id, user_id, -row["price"])
+        self.add_inventory(guild_id, user_id, item_id, 1)
+        return row, True
+
     def top_balances(self, guild_id: int, limit: int = 10):
         return self._exec("SELECT user_id, balance FROM economy_users WHERE guild_id=? ORDER BY balance DESC LIMIT ?", (guild_id, limit)).fetchall()
 
@@ -168,6 +566,7 @@ class Database:
     def list_shop_items(self, guild_id: int):
         return self._exec("SELECT * FROM economy_shop_items WHERE guild_id=? ORDER BY id DESC", (guild_id,)).fetchall()
 
+    @_atomic
     def add_inventory(self, guild_id: int, user_id: int, item_id: int, qty: int = 1):
         row = self._exec("SELECT qty FROM economy_inventory WHERE guild_id=? AND user_id=? AND item_id=?", (guild_id, user_id, item_id)).fetchone()
         if row:
@@ -181,3 +580,11 @@ class Database:
     # ----- audit -----
     def log_api_action(self, guild_id: int, actor_id: int, provider: str, action_key: str, target: str, result_json: str, created_at: str):
         self._exec("INSERT INTO api_action_audit (guild_id, actor_id, provider, action_key, target, result_json, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)", (guild_id, actor_id, provider, action_key, target, result_json, created_at))
+
+
+# Ordered schema steps; step N produces schema version N. Only ever append.
+MIGRATIONS = [
+    ("baseline tables", Database._create_tables),
+    ("hot query indexes", Database._add_hot_indexes),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
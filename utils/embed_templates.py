@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 import json
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
 import discord
 
+from core.templates import CompiledTemplate, compile_template
+
+TEMPLATE_NAMES = [
+    "session_start", "session_end", "session_announce",
+    "promotion", "demotion",
+    "infraction_issue", "infraction_update",
+    "appeal_submitted", "appeal_decision",
+    "economy_balance", "economy_transfer", "economy_shop", "economy_admin",
+    "api_action_result", "api_action_log",
+]
 
 BUILT_INS = {
     "date": lambda: datetime.utcnow().strftime("%Y-%m-%d"),
@@ -22,31 +34,115 @@ def validate_discohook_json(raw: str) -> dict[str, Any]:
     return data
 
 
-def _apply_vars(text: str, variables: dict[str, str]) -> str:
-    for k, v in variables.items():
-        text = text.replace("{" + k + "}", str(v))
-    return text
+@dataclass(frozen=True)
+class ParsedEmbed:
+    title: CompiledTemplate | None
+    description: CompiledTemplate | None
+    color: int
+    footer: CompiledTemplate | None
+    author: CompiledTemplate | None
+    thumbnail_url: str | None
+    image_url: str | None
 
 
-def build_from_template(raw_json: str, variables: dict[str, str]) -> tuple[str | None, list[discord.Embed]]:
+@dataclass(frozen=True)
+class ParsedTemplate:
+    content: CompiledTemplate | None
+    embeds: tuple[ParsedEmbed, ...]
+
+
+def _compile(value: Any) -> CompiledTemplate | None:
+    return compile_template(value) if isinstance(value, str) and value else None
+
+
+def parse_template(raw_json: str) -> ParsedTemplate:
+    # Validates and tokenizes once; rendering only substitutes variables.
     payload = validate_discohook_json(raw_json)
     content = payload.get("content")
-    if isinstance(content, str):
-        content = _apply_vars(content, variables)
+    embeds = []
+    for e in payload.get("embeds", [])[:5]:
+        footer = e.get("footer") if isinstance(e.get("footer"), dict) else None
+        author = e.get("author") if isinstance(e.get("author"), dict) else None
+        thumbnail = e.get("thumbnail") if isinstance(e.get("thumbnail"), dict) else None
+        image = e.get("image") if isinstance(e.get("image"), dict) else None
+        embeds.append(ParsedEmbed(
+            title=_compile(e.get("title")),
+            description=_compile(e.get("description")),
+            color=e.get("color", 0x5865F2),
+            footer=compile_template(footer.get("text", "")) if footer else None,
+            author=compile_template(author.get("name", "")) if author else None,
+            thumbnail_url=thumbnail.get("url", "") if thumbnail else None,
+            image_url=image.get("url", "") if image else None,
+        ))
+    return ParsedTemplate(content=compile_template(content) if isinstance(content, str) else None, embeds=tuple(embeds))
 
+
+def render_template(parsed: ParsedTemplate, variables: dict[str, Any]) -> tuple[str | None, list[discord.Embed]]:
+    content = parsed.content.render(variables) if parsed.content is not None else None
     embeds: list[discord.Embed] = []
-    for e in payload.get("embeds", [])[:5]:
-        title = _apply_vars(e.get("title", ""), variables) if e.get("title") else None
-        description = _apply_vars(e.get("description", ""), variables) if e.get("description") else None
-        color = e.get("color", 0x5865F2)
-        embed = discord.Embed(title=title, description=description, color=color)
-        if e.get("footer") and isinstance(e["footer"], dict):
-            embed.set_footer(text=_apply_vars(e["footer"].get("text", ""), variables))
-        if e.get("author") and isinstance(e["author"], dict):
-            embed.set_author(name=_apply_vars(e["author"].get("name", ""), variables))
-        if e.get("thumbnail") and isinstance(e["thumbnail"], dict):
-            embed.set_thumbnail(url=e["thumbnail"].get("url", ""))
-        if e.get("image") and isinstance(e["image"], dict):
-            embed.set_image(url=e["image"].get("url", ""))
+    for e in parsed.embeds:
+        title = e.title.render(variables) if e.title is not None else None
+        description = e.description.render(variables) if e.description is not None else None
+        embed = discord.Embed(title=title, description=description, color=e.color)
+        if e.footer is not None:
+            embed.set_footer(text=e.footer.render(variables))
+        if e.author is not None:
+            embed.set_author(name=e.author.render(variables))
+        if e.thumbnail_url is not None:
+            embed.set_thumbnail(url=e.thumbnail_url)
+        if e.image_url is not None:
+            embed.set_image(url=e.image_url)
         embeds.append(embed)
     return content, embeds
+
+
+def build_from_template(raw_json: str, variables: dict[str, str]) -> tuple[str | None, list[discord.Embed]]:
+    return render_template(parse_template(raw_json), variables)
+
+
+class TemplateRegistry:
+    # Parsed Discohook templates per (guild_id, name) in a bounded LRU.
+    # A cached None means the guild has not set that template.
+    def __init__(self, db, max_size: int = 512):
+        self.db = db
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[int, str], ParsedTemplate | None] = OrderedDict()
+        self._versions: dict[tuple[int, str], int] = {}
+
+    async def get(self, guild_id: int, name: str) -> ParsedTemplate | None:
+        key = (guild_id, name)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if name not in TEMPLATE_NAMES:
+            return None
+        version = self._versions.get(key, 0)
+        raw = await self.db.get_template(guild_id, name)
+        try:
+            parsed = parse_template(raw) if raw else None
+        except ValueError as e:
+            print(f"Ignoring invalid template {name} for guild {guild_id}: {e}")
+            parsed = None
+        # Skip the fill if set_template invalidated this key while we were loading.
+        if self._versions.get(key, 0) == version:
+            self._entries[key] = parsed
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return parsed
+
+    def invalidate(self, guild_id: int, name: str | None = None) -> None:
+        keys = [(guild_id, name)] if name else [k for k in self._entries if k[0] == guild_id]
+        for key in keys:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.pop(key, None)
+
+    async def render(self, guild_id: int, name: str, variables: dict[str, Any]) -> tuple[str | None, list[discord.Embed]] | None:
+        # None when the guild has no usable template, so callers fall back to their default embed.
+        parsed = await self.get(guild_id, name)
+        if parsed is None:
+            return None
+        guild_vars = await self.db.get_variables(guild_id)
+        content, embeds = render_template(parsed, {**guild_vars, **variables})
+        if not content and not embeds:
+            return None
+        return content, embeds
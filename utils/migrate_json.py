@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from core.serializers import is_binary, iter_binary_items, loads
+from utils.db import Database
+
+_decoder = json.JSONDecoder()
+_WS = " \t\r\n"
+_DELETED = object()
+UNLIMITED_EXPIRY = "9999-12-31T23:59:59+00:00"
+
+
+class _StreamReader:
+    # Incremental reader over a JSON file: walks objects key by key and only
+    # materializes the values it is asked for.
+    def __init__(self, fp, chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"Expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may be truncated.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def items(self) -> Iterator[str]:
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            sep = self.peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"Malformed object at offset {self.pos}")
+
+
+def iter_object_items(path: Path, keys: tuple[str, ...] = ()) -> Iterator[tuple[str, Any]]:
+    # Yields (key, value) for the object found at `keys` inside the file.
+    with path.open("rb") as raw:
+        if is_binary(raw):
+            yield from iter_binary_items(raw, keys)
+            return
+    with path.open("r", encoding="utf-8") as f:
+        reader = _StreamReader(f)
+        yield from _walk(reader, keys)
+
+
+def _walk(reader: _StreamReader, keys: tuple[str, ...]) -> Iterator[tuple[str, Any]]:
+    for key in reader.items():
+        if not keys:
+            yield key, reader.value()
+        elif key == keys[0] and reader.peek() == "{":
+            yield from _walk(reader, keys[1:])
+        else:
+            reader.value()
+
+
+def _journal_overrides(path: Path, key: str) -> dict[str, Any]:
+    # Changes still sitting in a JsonStore journal for items under `key`.
+    journal = path.with_suffix(".journal")
+    overrides: dict[str, Any] = {}
+    if not journal.exists():
+        return overrides
+    with journal.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                ops = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            for op in ops:
+                p = op[1]
+                if len(p) == 2 and p[0] == key:
+                    overrides[p[1]] = op[2] if op[0] == "s" else _DELETED
+    return overrides
+
+
+def iter_store_items(path: Path, key: str) -> Iterator[tuple[str, Any]]:
+    overrides = _journal_overrides(path, key)
+    if path.exists():
+        for item_key, value in iter_object_items(path, (key,)):
+            value = overrides.pop(item_key, value)
+            if value is not _DELETED:
+                yield item_key, value
+    for item_key, value in overrides.items():
+        if value is not _DELETED:
+            yield item_key, value
+
+
+def iter_guild_shards(data_dir: Path, name: str) -> Iterator[tuple[str, Any]]:
+    # Sharded stores (data/<name>/<guild_id>.json), falling back to the legacy single file.
+    shard_dir = data_dir / name
+    if shard_dir.is_dir():
+        for shard in sorted(shard_dir.glob("*.json")):
+            yield shard.stem, loads(shard.read_bytes())
+        return
+    legacy = data_dir / f"{name}.json"
+    if legacy.exists():
+        yield from iter_object_items(legacy)
+
+
+# ----- record translation -----
+@dataclass
+class Row:
+    table: str
+    source_key: str
+    values: dict[str, Any]
+    update_on_conflict: dict[str, Any] = field(default_factory=dict)
+
+
+def _case_rows(data_dir: Path) -> Iterator[Row]:
+    for cid, case in iter_store_items(data_dir / "cases.json", "items"):
+        yield Row("infractions", cid, {
+            "guild_id": case.get("guild_id"),
+            "user_id": case.get("target_id"),
+            "actor_id": case.get("actor_id"),
+            "reason": f"[{case.get('action', 'case')}] {case.get('reason', '')}",
+            "created_at": case.get("timestamp"),
+        })
+
+
+def _appeal_rows(data_dir: Path) -> Iterator[Row]:
+    for aid, appeal in iter_store_items(data_dir / "appeals.json", "items"):
+        yield Row("appeals", aid, {
+            "guild_id": appeal.get("guild_id"),
+            "user_id": appeal.get("user_id"),
+            "status": appeal.get("status", "pending"),
+            "reason": appeal.get("reason"),
+            "evidence": f"Case #{appeal.get('case_id')}",
+            "created_at": appeal.get("created_at"),
+        })
+
+
+def _session_rows(data_dir: Path) -> Iterator[Row]:
+    for gid, members in iter_guild_shards(data_dir, "sessions"):
+        for uid, info in members.items():
+            for h in info.get("history", []):
+                # An open session migrated earlier gets closed on a later run.
+                yield Row("sessions", f"{gid}:{uid}:{h['start']}", {
+                    "guild_id": int(gid),
+                    "user_id": int(uid),
+                    "started_at": h["start"],
+                    "ended_at": h["end"],
+                }, update_on_conflict={"ended_at": h["end"]})
+            if info.get("active") and info.get("started_at"):
+                yield Row("sessions", f"{gid}:{uid}:{info['started_at']}", {
+                    "guild_id": int(gid),
+                    "user_id": int(uid),
+                    "started_at": info["started_at"],
+                    "ended_at": None,
+                })
+
+
+def _staff_rows(data_dir: Path) -> Iterator[Row]:
+    kinds = {"promote": "promotion", "demote": "demotion"}
+    for gid, members in iter_guild_shards(data_dir, "staff"):
+        for uid, record in members.items():
+            for i, h in enumerate(record.get("history", [])):
+                details = {k: v for k, v in h.items() if k not in {"action", "by", "at"}}
+                yield Row("staff_events", f"{gid}:{uid}:h{i}", {
+                    "guild_id": int(gid),
+                    "user_id": int(uid),
+                    "actor_id": h.get("by"),
+                    "event_type": kinds.get(h.get("action"), h.get("action")),
+                    "details_json": json.dumps(details),
+                    "created_at": h.get("at"),
+                })
+            for i, inf in enumerate(record.get("infractions", [])):
+                yield Row("staff_events", f"{gid}:{uid}:i{i}", {
+                    "guild_id": int(gid),
+                    "user_id": int(uid),
+                    "actor_id": inf.get("by"),
+                    "event_type": "infraction",
+                    "details_json": json.dumps({"reason": inf.get("reason"), "points": inf.get("points")}),
+                    "created_at": inf.get("at"),
+                })
+
+
+def _premium_rows(data_dir: Path) -> Iterator[Row]:
+    for gid, info in iter_store_items(data_dir / "premium.json", "guilds"):
+        if info.get("active"):
+            yield Row("premium", gid, {"guild_id": int(gid), "expires_at": info.get("expires_at") or UNLIMITED_EXPIRY})
+
+
+# Warnings are not migrated separately: every warning already produced a "warn" case.
+SOURCES: dict[str, Callable[[Path], Iterator[Row]]] = {
+    "cases": _case_rows,
+    "appeals": _appeal_rows,
+    "sessions": _session_rows,
+    "staff": _staff_rows,
+    "premium": _premium_rows,
+}
+# Premium is an upsert keyed by guild, so it is re-synced on every run.
+UPSERT_SOURCES = {"premium"}
+
+
+# ----- engine -----
+def _ensure_tables(db: Database) -> None:
+    db._exec("CREATE TABLE IF NOT EXISTS migration_map (source TEXT, source_key TEXT, target_id INTEGER, PRIMARY KEY (source, source_key))")
+    db._exec("CREATE TABLE IF NOT EXISTS migration_checkpoints (source TEXT PRIMARY KEY, last_key TEXT, rows INTEGER NOT NULL DEFAULT 0, updated_at TEXT, completed_at TEXT)")
+
+
+def _flush_batch(db: Database, source: str, batch: list[Row]) -> int:
+    conn = db.conn
+    keys = [r.source_key for r in batch]
+    marks = ",".join("?" for _ in keys)
+    done = {
+        row[0]: row[1]
+        for row in conn.execute(f"SELECT source_key, target_id FROM migration_map WHERE source=? AND source_key IN ({marks})", (source, *keys))
+    }
+    inserted = 0
+    now = datetime.now(timezone.utc).isoformat()
+    # One transaction per batch: rows, map entries and checkpoint land together.
+    with db.transaction():
+        for r in batch:
+            if source in UPSERT_SOURCES:
+                cols = ", ".join(r.values)
+                conn.execute(f"INSERT OR REPLACE INTO {r.table} ({cols}) VALUES ({','.join('?' for _ in r.values)})", tuple(r.values.values()))
+                inserted += 1
+                continue
+            if r.source_key in done:
+                if r.update_on_conflict and done[r.source_key] is not None:
+                    sets = ", ".join(f"{c}=?" for c in r.update_on_conflict)
+                    conn.execute(f"UPDATE {r.table} SET {sets} WHERE id=? AND ended_at IS NULL", (*r.update_on_conflict.values(), done[r.source_key]))
+                continue
+            cols = ", ".join(r.values)
+            cur = conn.execute(f"INSERT INTO {r.table} ({cols}) VALUES ({','.join('?' for _ in r.values)})", tuple(r.values.values()))
+            conn.execute("INSERT INTO migration_map (source, source_key, target_id) VALUES (?, ?, ?)", (source, r.source_key, cur.lastrowid))
+            done[r.source_key] = cur.lastrowid
+            inserted += 1
+        conn.execute(
+            "INSERT INTO migration_checkpoints (source, last_key, rows, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(source) DO UPDATE SET last_key=excluded.last_key, rows=rows+excluded.rows, updated_at=excluded.updated_at, completed_at=NULL",
+            (source, keys[-1], inserted, now),
+        )
+    return inserted
+
+
+def migrate_source(db: Database, data_dir: Path, source: str, batch_size: int = 500, progress: Callable[[str, int], None] | None = None) -> int:
+    _ensure_tables(db)
+    total = 0
+    batch: list[Row] = []
+    for row in SOURCES[source](data_dir):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += _flush_batch(db, source, batch)
+            batch = []
+            if progress:
+                progress(source, total)
+    if batch:
+        total += _flush_batch(db, source, batch)
+    with db.transaction():
+        db.conn.execute(
+            "INSERT INTO migration_checkpoints (source, rows, updated_at, completed_at) VALUES (?, 0, ?, ?) "
+            "ON CONFLICT(source) DO UPDATE SET completed_at=excluded.completed_at",
+            (source, datetime.now(timezone.utc).isoformat(), datetime.now(timezone.utc).isoformat()),
+        )
+    return total
+
+
+def migrate_all(db: Database, data_dir: str | Path = "data", sources: list[str] | None = None, batch_size: int = 500, progress: Callable[[str, int], None] | None = None) -> dict[str, int]:
+    data_dir = Path(data_dir)
+    return {name: migrate_source(db, data_dir, name, batch_size, progress) for name in (sources or list(SOURCES))}
+
+
+def run_migration(db_path: str | Path, data_dir: str | Path = "data", sources: list[str] | None = None, batch_size: int = 500) -> dict[str, int]:
+    # Opens its own connection so it can run on a worker thread next to the bot's.
+    db = Database(str(db_path))
+    try:
+        return migrate_all(db, data_dir, sources, batch_size)
+    finally:
+        db.conn.close()
+
+
+def checkpoints(db: Database) -> list[Any]:
+    _ensure_tables(db)
+    return db._exec("SELECT source, last_key, rows, updated_at, completed_at FROM migration_checkpoints ORDER BY source").fetchall()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate the JSON stores (bot.py runtime) into the SQLite database.")
+    parser.add_argument("--db", default="data/bot.db")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--source", action="append", choices=list(SOURCES), help="Limit to one or more sources (default: all)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--status", action="store_true", help="Only print migration checkpoints")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    if not args.status:
+        result = migrate_all(db, args.data_dir, args.source, args.batch_size, lambda s, n: print(f"{s}: {n} rows"))
+        for name, count in result.items():
+            print(f"{name}: migrated {count} new rows")
+    for row in checkpoints(db):
+        print(f"{row['source']}: rows={row['rows']} last_key={row['last_key']} completed_at={row['completed_at']}")
+
+
+if __name__ == "__main__":
+    main()
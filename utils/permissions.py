@@ -6,7 +6,7 @@ import discord
 
 
 async def has_group_permission(db, interaction: discord.Interaction, group: str) -> bool:
-    cfg = db.get_guild_config(interaction.guild_id)
+    cfg = await db.get_guild_config(interaction.guild_id)
     if not cfg.get("module_enabled", {}).get(group.split("_")[0], True):
         return False
 
@@ -14,7 +14,7 @@ async def has_group_permission(db, interaction: discord.Interaction, group: str)
         if interaction.user.guild_permissions.administrator:
             return True
 
-    allowed_role_ids: Iterable[int] = db.get_permission_roles(interaction.guild_id, group)
+    allowed_role_ids: Iterable[int] = await db.get_permission_roles(interaction.guild_id, group)
     if not allowed_role_ids:
         return False
 